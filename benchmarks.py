@@ -0,0 +1,298 @@
+# benchmarks.py
+# Micro-benchmarks for the hot paths. Usage: python benchmarks.py [name ...]
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from db import Database, connect
+from option_chain import OptionChain
+from trigger_engine import TriggerOrderEngine
+from trigger_store import TriggerOrderStore
+
+
+def _timeit(fn, repeat=50):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _timeit_fresh(fn, contracts, repeat=10):
+    copies = [_synthetic_chain(contracts) for _ in range(repeat)]
+    best = float('inf')
+    for options in copies:
+        start = time.perf_counter()
+        fn(options)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _synthetic_chain(contracts=2000, expiry='171025'):
+    """Delta API जैसी string fields वाली synthetic chain"""
+    rng = random.Random(42)
+    options = []
+    strikes = [80000 + 100 * i for i in range(contracts // 2)]
+    spot = strikes[len(strikes) // 2]
+    for i, strike in enumerate(strikes):
+        call_delta = max(0.01, min(0.99, 0.5 - (strike - spot) / 20000 + rng.uniform(-0.02, 0.02)))
+        for kind, prefix, delta in (('call_options', 'C', call_delta), ('put_options', 'P', call_delta - 1)):
+            options.append({
+                'symbol': f'{prefix}-BTC-{strike}-{expiry}',
+                'product_id': 100000 + len(options),
+                'contract_type': kind,
+                'strike_price': str(strike),
+                'mark_price': f'{rng.uniform(5, 3000):.2f}',
+                'greeks': {
+                    'delta': f'{delta:.4f}',
+                    'gamma': f'{rng.uniform(0, 0.001):.6f}',
+                    'theta': f'{-rng.uniform(0, 50):.4f}',
+                    'vega': f'{rng.uniform(0, 30):.4f}',
+                    'rho': f'{rng.uniform(-1, 1):.4f}'
+                }
+            })
+    return options
+
+
+def _legacy_select(options, delta_min=0.44, delta_max=0.58):
+    """पुराना per-request Python loop (normalize + comprehensions + strike_map)"""
+    for opt in options:
+        if isinstance(opt['mark_price'], str):
+            opt['mark_price'] = float(opt['mark_price'])
+        for key in ['delta', 'gamma', 'rho', 'theta', 'vega']:
+            if isinstance(opt['greeks'][key], str):
+                opt['greeks'][key] = float(opt['greeks'][key])
+    calls = [o for o in options if o['contract_type'] == 'call_options'
+             and o['greeks']['delta'] and delta_min <= abs(o['greeks']['delta']) <= delta_max]
+    puts = [o for o in options if o['contract_type'] == 'put_options'
+            and o['greeks']['delta'] and delta_min <= abs(o['greeks']['delta']) <= delta_max]
+    best_call = max(calls, key=lambda x: x['greeks']['delta']) if calls else None
+    best_put = max(puts, key=lambda x: abs(x['greeks']['delta'])) if puts else None
+    strike_map = {}
+    for opt in calls + puts:
+        strike = float(opt['symbol'].split('-')[2])
+        strike_map.setdefault(strike, {})[opt['contract_type']] = opt
+    pairs = [k for k, v in strike_map.items() if len(v) == 2]
+    return best_call, best_put, pairs
+
+
+def bench_chain(contracts=2000):
+    print(f"== Option chain selection ({contracts} contracts) ==")
+    raw = _synthetic_chain(contracts)
+
+    # Fresh (string-valued) copies so the one-time parse is measured each run
+    legacy_ms = _timeit_fresh(_legacy_select, contracts)
+    build_ms = _timeit_fresh(OptionChain, contracts)
+
+    chain = OptionChain(raw)
+    select_ms = _timeit(lambda: (
+        chain.select_max_delta('call'),
+        chain.select_max_delta('put'),
+        chain.straddle_pairs()
+    ))
+
+    legacy = _legacy_select(_synthetic_chain(contracts))
+    assert legacy[0]['symbol'] == chain.select_max_delta('call')['symbol']
+    assert legacy[1]['symbol'] == chain.select_max_delta('put')['symbol']
+    assert sorted(legacy[2]) == [s for s, _, _ in chain.straddle_pairs()]
+
+    print(f"legacy per-request loop       : {legacy_ms:8.3f} ms")
+    print(f"columnar build (per refresh)  : {build_ms:8.3f} ms")
+    print(f"columnar select (per request) : {select_ms:8.3f} ms")
+
+
+def _random_walk(start, steps, step_size, seed=7):
+    rng = random.Random(seed)
+    price = start
+    prices = []
+    for _ in range(steps):
+        price += rng.gauss(0, step_size)
+        prices.append(price)
+    return prices
+
+
+def bench_triggers(resting=10000, ticks=5000):
+    print(f"== Trigger evaluation ({resting} resting orders, {ticks} ticks) ==")
+    rng = random.Random(3)
+    spot = 100000.0
+    orders = []
+    for i in range(resting):
+        condition = 'above' if i % 2 else 'below'
+        offset = rng.uniform(50, 5000)
+        orders.append({
+            'id': f'order-{i}',
+            'trigger_price': str(spot + offset if condition == 'above' else spot - offset),
+            'trigger_condition': condition,
+            'status': 'pending'
+        })
+    prices = _random_walk(spot, ticks, 15)
+
+    # Legacy: copy list, float() every trigger_price, compare every order on every pass
+    legacy_orders = [dict(o) for o in orders]
+    legacy_fired = 0
+    start = time.perf_counter()
+    for price in prices:
+        for order in legacy_orders[:]:
+            if order['status'] == 'pending':
+                trigger_price = float(order['trigger_price'])
+                if (order['trigger_condition'] == 'above' and price >= trigger_price) or \
+                        (order['trigger_condition'] == 'below' and price <= trigger_price):
+                    order['status'] = 'executed'
+                    legacy_fired += 1
+        legacy_orders = [o for o in legacy_orders if o['status'] == 'pending']
+    legacy_ms = (time.perf_counter() - start) * 1000
+
+    fired = []
+    store = TriggerOrderStore()
+    engine = TriggerOrderEngine(store, lambda order, price: fired.append(order['id']))
+    start = time.perf_counter()
+    for order in orders:
+        store.add(dict(order))
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for price in prices:
+        engine.process_tick(price)
+    engine_ms = (time.perf_counter() - start) * 1000
+
+    assert len(fired) == legacy_fired
+    print(f"orders fired                  : {legacy_fired}")
+    print(f"legacy scan, per tick         : {legacy_ms / ticks * 1000:8.1f} us")
+    print(f"engine index build (once)     : {build_ms:8.1f} ms")
+    print(f"engine, per tick              : {engine_ms / ticks * 1000:8.1f} us")
+
+
+_DB_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS pending_trigger_orders (
+        id TEXT PRIMARY KEY, symbol TEXT, trigger_price REAL, status TEXT DEFAULT 'pending'
+    )
+"""
+_DB_UPDATE_SQL = 'UPDATE pending_trigger_orders SET status = ? WHERE id = ?'
+_DB_SELECT_SQL = 'SELECT status FROM pending_trigger_orders WHERE id = ?'
+
+
+def _db_plan(operations):
+    ids = [f'order-{i}' for i in range(500)]
+    rng = random.Random(5)
+    return ids, [(rng.choice(ids), rng.choice(('pending', 'executed'))) for _ in range(operations)]
+
+
+def _db_setup(path, ids):
+    conn = sqlite3.connect(path)
+    conn.execute(_DB_SCHEMA)
+    conn.executemany('INSERT INTO pending_trigger_orders (id, symbol, trigger_price) VALUES (?, ?, ?)',
+                     [(order_id, 'C-BTC-100000-171025', 100000.0) for order_id in ids])
+    conn.commit()
+    conn.close()
+
+
+def bench_db(operations=2000):
+    print(f"== trading_config.db access ({operations} status updates + point reads) ==")
+    ids, plan = _db_plan(operations)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Legacy: connect/commit/close on every call (rollback journal, synchronous=FULL)
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        _db_setup(legacy_path, ids)
+        start = time.perf_counter()
+        for order_id, status in plan:
+            conn = sqlite3.connect(legacy_path)
+            conn.execute(_DB_UPDATE_SQL, (status, order_id))
+            conn.commit()
+            conn.close()
+            conn = sqlite3.connect(legacy_path)
+            conn.execute(_DB_SELECT_SQL, (order_id,)).fetchone()
+            conn.close()
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        # Persistent pooled WAL connection, synchronous=NORMAL, cached statements
+        db_path = os.path.join(tmp, 'wal.db')
+        _db_setup(db_path, ids)
+        db = Database(db_path)
+        start = time.perf_counter()
+        for order_id, status in plan:
+            db.execute(_DB_UPDATE_SQL, (status, order_id))
+            db.query_one(_DB_SELECT_SQL, (order_id,))
+        db_ms = (time.perf_counter() - start) * 1000
+        db.close()
+
+    print(f"per-call connect, per op      : {legacy_ms / operations * 1000:8.1f} us")
+    print(f"persistent WAL, per op        : {db_ms / operations * 1000:8.1f} us")
+    print(f"speedup                       : {legacy_ms / db_ms:8.1f} x")
+
+
+def _run_request_threads(handler, plan, concurrency):
+    """Werkzeug threaded server जैसा: हर request नए thread पर, एक समय में concurrency तक"""
+    slots = threading.Semaphore(concurrency)
+    threads = []
+
+    def run(item):
+        try:
+            handler(*item)
+        finally:
+            slots.release()
+
+    start = time.perf_counter()
+    for item in plan:
+        slots.acquire()
+        thread = threading.Thread(target=run, args=(item,))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_db_threads(requests=2000, concurrency=16):
+    print(f"== trading_config.db under threaded requests ({requests} requests, {concurrency} concurrent) ==")
+    ids, plan = _db_plan(requests)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Per-thread connection: हर request thread नया है, तो हर request पर नया connection
+        per_thread_path = os.path.join(tmp, 'per_thread.db')
+        _db_setup(per_thread_path, ids)
+        connect(per_thread_path).close()   # WAL mode file पर set हो जाए
+
+        def per_thread(order_id, status):
+            conn = connect(per_thread_path)
+            with conn:
+                conn.execute(_DB_UPDATE_SQL, (status, order_id))
+            conn.execute(_DB_SELECT_SQL, (order_id,)).fetchone()
+            conn.close()
+        per_thread_ms = _run_request_threads(per_thread, plan, concurrency)
+
+        # Shared bounded pool (db.Database)
+        pool_path = os.path.join(tmp, 'pool.db')
+        _db_setup(pool_path, ids)
+        db = Database(pool_path)
+
+        def pooled(order_id, status):
+            db.execute(_DB_UPDATE_SQL, (status, order_id))
+            db.query_one(_DB_SELECT_SQL, (order_id,))
+        pool_ms = _run_request_threads(pooled, plan, concurrency)
+        opened, waits = db.connections_opened, db.waits
+        db.close()
+
+    print(f"connection per thread, per req: {per_thread_ms / requests * 1000:8.1f} us ({requests} connections)")
+    print(f"shared pool, per req          : {pool_ms / requests * 1000:8.1f} us "
+          f"({opened} of {db.pool_size} connections, {waits} waits)")
+    print(f"speedup                       : {per_thread_ms / pool_ms:8.1f} x")
+
+
+BENCHMARKS = {
+    'chain': bench_chain,
+    'triggers': bench_triggers,
+    'db': bench_db,
+    'db_threads': bench_db_threads,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
+        print()
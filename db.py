@@ -0,0 +1,134 @@
+# db.py
+# Long-lived, tuned SQLite connection pool for trading_config.db
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = 'trading_config.db'
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE = 256
+POOL_SIZE = 4
+
+
+def connect(path=DB_PATH, check_same_thread=False):
+    """
+    Tuned connection खोलता है:
+    - WAL journaling: readers writers को block नहीं करते, commit पर पूरी file rewrite नहीं
+    - synchronous=NORMAL: WAL में हर commit पर fsync नहीं, सिर्फ checkpoint पर
+    - busy_timeout: "database is locked" की जगह lock मिलने तक wait
+    - cached_statements: same SQL text वाले statements एक बार prepare होकर reuse होते हैं
+    """
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=check_same_thread,
+                           cached_statements=STATEMENT_CACHE)
+    if path != ':memory:':
+        conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+
+class Database:
+    """
+    Long-lived connections का छोटा bounded pool (default POOL_SIZE)।
+    Flask का threaded server हर request नए thread पर चलाता है, इसलिए per-thread connections
+    हर request पर नया connection खोलते - pool में connections threads के बीच reuse होते हैं।
+    - हर operation pool से एक connection borrow करके खत्म होते ही लौटाता है; सब busy हों
+      तो किसी के लौटने तक wait (connections pool_size से ज़्यादा कभी नहीं खुलते)
+    - उसी thread में nested borrow (जैसे transaction के अंदर query) वही connection पाता है
+    - WAL की वजह से pool के readers writer को block नहीं करते
+    """
+
+    def __init__(self, path=DB_PATH, pool_size=POOL_SIZE):
+        self.path = path
+        # ':memory:' हर connection पर अलग database है - वहाँ एक ही connection
+        self.pool_size = 1 if path == ':memory:' else max(1, pool_size)
+        self.connections_opened = 0
+        self.waits = 0
+        self._idle = []
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def _acquire(self):
+        with self._cond:
+            while not self._idle and self.connections_opened >= self.pool_size:
+                self.waits += 1
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self.connections_opened += 1
+        try:
+            return connect(self.path)
+        except Exception:
+            with self._cond:
+                self.connections_opened -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn):
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Pool से connection borrow करता है; block खत्म होते ही वापस pool में"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            # अधूरा transaction अगले borrower तक न पहुँचे
+            if conn.in_transaction:
+                conn.rollback()
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Block सफल होने पर commit, exception पर rollback"""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def execute(self, sql, params=()):
+        """एक write statement अपने transaction में - affected rows return करता है"""
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def executemany(self, sql, seq_of_params):
+        with self.transaction() as conn:
+            return conn.executemany(sql, seq_of_params).rowcount
+
+    def query(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def close(self):
+        """Idle connections बंद करता है (borrowed connections लौटने पर pool में वापस आते हैं)"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self.connections_opened -= len(idle)
+        for conn in idle:
+            conn.close()
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path=DB_PATH):
+    """Path के लिए process-wide Database"""
+    with _databases_lock:
+        database = _databases.get(path)
+        if database is None:
+            database = _databases[path] = Database(path)
+        return database
@@ -3,7 +3,6 @@ from datetime import datetime, timedelta
 import time
 import threading
 import uuid
-import requests
 import json
 import hashlib
 import hmac
@@ -11,8 +10,18 @@ import urllib.parse
 import socket
 import os
 import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from pathlib import Path
+from price_stream import DeltaPriceStream
+from price_events import PriceDispatcher
+from scheduler import DeadlineScheduler
+from http_transport import transport
+from pnl_ledger import RealizedPnlLedger
+from price_alerts import PriceAlertBook
+from polling import AdaptivePollInterval
+from exit_levels import ExitLevelStore
 
 # Load environment variables
 BASE_DIR = Path(__file__).resolve().parent
@@ -37,7 +46,7 @@ def send_telegram_alert(message, chat_id=None):
         "parse_mode": "HTML"
     }
     try:
-        response = requests.post(url, json=payload, timeout=5)
+        response = transport.post(url, json=payload)
         return response.status_code == 200
     except Exception as e:
         print(f"Telegram error: {str(e)}")
@@ -54,11 +63,41 @@ def generate_signature(secret, message):
 
 # ============ DELTA EXCHANGE API CLASS ============
 
+TICKER_CONTRACT_TYPES = ('call_options', 'put_options', 'perpetual_futures', 'futures')
+
+
+def position_contract_type(position):
+    """Position का contract type - product object से, वरना symbol prefix (C-/P-) से; पता न चले तो None"""
+    product = position.get('product') or {}
+    if product.get('contract_type') in TICKER_CONTRACT_TYPES:
+        return product['contract_type']
+    symbol = position.get('product_symbol') or product.get('symbol') or ''
+    if symbol.startswith('C-'):
+        return 'call_options'
+    if symbol.startswith('P-'):
+        return 'put_options'
+    return None
+
+
+def ticker_contract_types(contract_types):
+    """Bulk /v2/tickers के लिए सिर्फ held contract types; कोई unknown हो तो सभी types"""
+    types = set(contract_types or ())
+    if not types or not types <= set(TICKER_CONTRACT_TYPES):
+        return TICKER_CONTRACT_TYPES
+    return tuple(t for t in TICKER_CONTRACT_TYPES if t in types)
+
+
 class DeltaExchangeAPI:
-    def __init__(self):
+    def __init__(self, ticker_cache_ttl=2.0):
         self.api_key = os.getenv("DELTA_API_KEY", "DEFAULT_KEY")
         self.api_secret = os.getenv("DELTA_API_SECRET", "DEFAULT_SECRET")
         self.base_url = "https://api.india.delta.exchange"
+        self.http = transport
+        
+        # Bulk ticker marks - कुछ seconds के लिए cache, ताकि बार-बार /pnl पूरा market download न करे
+        self.ticker_cache_ttl = ticker_cache_ttl
+        self._ticker_cache = {}   # contract types -> (fetched_at, {product_id: mark})
+        self._ticker_lock = threading.Lock()
         
     def generate_signature(self, method, endpoint, body=None, params=None):
         ts = str(int(time.time()))
@@ -105,10 +144,9 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.get(
+            response = self.http.get(
                 self.base_url + full_path,
-                headers=headers,
-                timeout=10
+                headers=headers
             )
             
             if response.status_code == 200:
@@ -136,9 +174,12 @@ class DeltaExchangeAPI:
         except Exception as e:
             return {"success": False, "error": str(e)}
             
-    def place_market_order(self, product_id, side, size):
+    def place_market_order(self, product_id, side, size, client_order_id=None):
         """
         Delta Exchange पर एक मार्केट ऑर्डर देता है।
+        client_order_id order के साथ जाता है ताकि बाद में get_order_by_client_id से ढूंढा जा सके।
+        Exchange उसी id का दूसरा order reject करेगा, इस पर भरोसा नहीं किया जाता (verified नहीं) -
+        retry की safety place_market_order_idempotent के lookup से है।
         """
         endpoint = "/v2/orders"
         method = "POST"
@@ -153,6 +194,8 @@ class DeltaExchangeAPI:
             "reduce_only": False,
             "mmp": "disabled"
         }
+        if client_order_id:
+            order_payload["client_order_id"] = client_order_id
         
         ts, signature, _ = self.generate_signature(method, endpoint, order_payload)
         
@@ -165,22 +208,88 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.base_url + endpoint,
                 headers=headers,
-                json=order_payload,
-                timeout=10
+                json=order_payload
             )
             
             if response.status_code == 200:
                 return response.json()
             else:
                 error_msg = f"{response.status_code} - {response.text}"
-                return {"error": error_msg, "success": False}
+                return {"error": error_msg, "success": False, "status_code": response.status_code}
                 
         except Exception as e:
             return {"error": str(e), "success": False}
     
+    def get_order_by_client_id(self, client_order_id):
+        """
+        client_order_id से order ढूंढता है। तीन नतीजे:
+        - मिला: {"success": True, "result": order}
+        - नहीं मिला (404 या खाली result): {"success": True, "result": None}
+        - पता नहीं (network error/timeout/5xx/auth): {"success": False, "error": ...}
+        """
+        endpoint = f"/v2/orders/client_order_id/{client_order_id}"
+        method = "GET"
+        
+        ts, signature, full_path = self.generate_signature(method, endpoint)
+        
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "api-key": self.api_key,
+            "signature": signature,
+            "timestamp": ts
+        }
+        
+        try:
+            response = self.http.get(self.base_url + full_path, headers=headers)
+            if response.status_code == 404:
+                return {"success": True, "result": None}
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("success"):
+                    return {"success": True, "result": data.get("result") or None}
+            return {"error": f"{response.status_code} - {response.text}", "success": False,
+                    "status_code": response.status_code}
+        except Exception as e:
+            return {"error": str(e), "success": False}
+    
+    def place_market_order_idempotent(self, product_id, side, size, client_order_id, attempts=3, backoff=0.25):
+        """
+        Timeouts/5xx पर उसी client_order_id के साथ retry करता है।
+        हर retry से पहले client_order_id से check होता है कि पिछली attempt exchange तक पहुँच गई थी या नहीं:
+        मिली तो वही order return, साफ़ not-found पर ही दोबारा भेजा जाता है। Lookup खुद fail हो
+        (state unknown) तो retry नहीं होता - {"error", "unknown_state": True} return होता है,
+        क्योंकि दोबारा भेजना double fill कर सकता है।
+        """
+        result = None
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(backoff * attempt)
+                lookup = self.get_order_by_client_id(client_order_id)
+                if not lookup.get("success"):
+                    return {
+                        "error": f"Order state unknown after {attempt} attempt(s): {result.get('error')}; "
+                                 f"lookup failed: {lookup.get('error')}",
+                        "success": False,
+                        "unknown_state": True,
+                        "client_order_id": client_order_id,
+                        "attempts": attempt
+                    }
+                if lookup.get("result"):
+                    return {"success": True, "result": lookup["result"], "attempts": attempt, "recovered": True}
+            
+            result = self.place_market_order(product_id, side, size, client_order_id=client_order_id)
+            status_code = result.get("status_code")
+            retryable = not result.get("success") and (status_code is None or status_code == 429 or status_code >= 500)
+            if not retryable:
+                break
+        
+        result["attempts"] = attempt + 1
+        return result
+    
     def place_stop_loss_order(self, product_id, side, size, stop_price):
         """
         Stop Loss ऑर्डर प्लेस करता है।
@@ -211,11 +320,10 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.base_url + endpoint,
                 headers=headers,
-                json=order_payload,
-                timeout=10
+                json=order_payload
             )
             
             if response.status_code == 200:
@@ -255,11 +363,10 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.base_url + endpoint,
                 headers=headers,
-                json=order_payload,
-                timeout=10
+                json=order_payload
             )
             
             if response.status_code == 200:
@@ -288,10 +395,9 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.get(
+            response = self.http.get(
                 self.base_url + full_path,
-                headers=headers,
-                timeout=10
+                headers=headers
             )
             
             if response.status_code == 200:
@@ -326,10 +432,9 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.get(
+            response = self.http.get(
                 self.base_url + full_path,
-                headers=headers,
-                timeout=10
+                headers=headers
             )
             
             if response.status_code == 200:
@@ -347,16 +452,19 @@ class DeltaExchangeAPI:
     
     def cancel_all_orders(self, product_id=None):
         """
-        सभी ऑर्डर्स कैंसल करता है।
+        सभी ओपन ऑर्डर्स (limit + stop) एक ही request में कैंसल करता है।
         """
-        endpoint = "/v2/orders"
+        endpoint = "/v2/orders/all"
         method = "DELETE"
         
-        params = {}
+        order_payload = {
+            "cancel_limit_orders": True,
+            "cancel_stop_orders": True
+        }
         if product_id:
-            params["product_id"] = product_id
+            order_payload["product_id"] = product_id
         
-        ts, signature, full_path = self.generate_signature(method, endpoint, params=params)
+        ts, signature, _ = self.generate_signature(method, endpoint, order_payload)
         
         headers = {
             "Content-Type": "application/json",
@@ -367,10 +475,10 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.delete(
-                self.base_url + full_path,
+            response = self.http.delete(
+                self.base_url + endpoint,
                 headers=headers,
-                timeout=10
+                json=order_payload
             )
             
             if response.status_code == 200:
@@ -406,11 +514,10 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.base_url + endpoint,
                 headers=headers,
-                json=order_payload,
-                timeout=10
+                json=order_payload
             )
             
             if response.status_code == 200:
@@ -440,7 +547,7 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.delete(
+            response = self.http.delete(
                 self.base_url + full_path,
                 headers=headers,
                 timeout=5
@@ -471,10 +578,9 @@ class DeltaExchangeAPI:
         }
         
         try:
-            response = requests.get(
+            response = self.http.get(
                 self.base_url + full_path,
-                headers=headers,
-                timeout=10
+                headers=headers
             )
             
             if response.status_code == 200:
@@ -501,7 +607,7 @@ class DeltaExchangeAPI:
         """
         try:
             url = f"{self.base_url}/v2/tickers/{product_id}"
-            response = requests.get(url, timeout=10)
+            response = self.http.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -511,6 +617,67 @@ class DeltaExchangeAPI:
         except Exception as e:
             return None
 
+    def warm_up(self):
+        """
+        Exchange के connection pool को warm रखता है (एक हल्का public GET) ताकि
+        exit के समय नया TCP+TLS handshake न करना पड़े।
+        """
+        try:
+            response = self.http.get(f"{self.base_url}/v2/tickers/BTCUSD")
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    def _bulk_ticker_marks(self, contract_types):
+        """{product_id: mark} सिर्फ दिए गए contract types के लिए - ticker_cache_ttl तक cached"""
+        key = ticker_contract_types(contract_types)
+        with self._ticker_lock:
+            entry = self._ticker_cache.get(key)
+            if entry and time.time() - entry[0] <= self.ticker_cache_ttl:
+                return entry[1]
+        
+        marks = {}
+        response = self.http.get(
+            f"{self.base_url}/v2/tickers",
+            params={"contract_types": ",".join(key)}
+        )
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('success'):
+                for ticker in data.get('result') or []:
+                    if ticker.get('mark_price') is not None:
+                        marks[ticker.get('product_id')] = float(ticker['mark_price'])
+                with self._ticker_lock:
+                    self._ticker_cache[key] = (time.time(), marks)
+        return marks
+    
+    def get_mark_prices(self, product_ids, contract_types=None, max_workers=8):
+        """
+        कई products के mark prices एक pass में लाता है।
+        पहले held contract types के लिए एक (briefly cached) bulk /v2/tickers request,
+        जो product उसमें न मिले उनके लिए bounded concurrent fan-out।
+        Returns: {product_id: mark_price}
+        """
+        wanted = {pid for pid in product_ids if pid is not None}
+        marks = {}
+        if not wanted:
+            return marks
+        
+        try:
+            bulk = self._bulk_ticker_marks(contract_types)
+            marks = {pid: bulk[pid] for pid in wanted if pid in bulk}
+        except Exception as e:
+            print(f"Bulk ticker fetch error: {e}")
+        
+        missing = [pid for pid in wanted if pid not in marks]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+                for pid, mark in zip(missing, pool.map(self.get_product_ticker, missing)):
+                    if mark is not None:
+                        marks[pid] = mark
+        
+        return marks
+
     def get_unrealized_pnl_calculated(self):
         """
         Open positions का total unrealized PNL calculate करता है
@@ -534,8 +701,8 @@ class DeltaExchangeAPI:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.request(
-                method, url, data=payload, params={}, timeout=10, headers=req_headers
+            response = self.http.request(
+                method, url, data=payload, params={}, headers=req_headers
             )
             
             if response.status_code == 200:
@@ -545,13 +712,19 @@ class DeltaExchangeAPI:
                     positions = data['result']
                     total_unrealized_pnl = 0.0
                     
+                    # Get current mark prices for all positions in one pass
+                    open_positions = [pos for pos in positions if float(pos.get('size', 0)) != 0]
+                    mark_prices = self.get_mark_prices(
+                        [pos.get('product_id') for pos in open_positions],
+                        contract_types=[position_contract_type(pos) for pos in open_positions]
+                    )
+                    
                     for pos in positions:
                         product_id = pos.get('product_id')
                         size = float(pos.get('size', 0))
                         entry_price = float(pos.get('entry_price', 0))
                         
-                        # Get current mark price
-                        mark_price = self.get_product_ticker(product_id)
+                        mark_price = mark_prices.get(product_id)
                         
                         if mark_price and size != 0:
                             # Calculate unrealized PNL
@@ -567,74 +740,68 @@ class DeltaExchangeAPI:
         except Exception as e:
             return 0.0
 
-    def get_realized_pnl_from_csv(self):
+    def get_order_history(self, start_time=None, after=None, page_size=100):
         """
-        Last closed order का realized PNL return करता है (CSV endpoint से)
+        Order history का एक page लाता है (newest first)।
+        start_time unix microseconds में है, after अगले page का cursor है।
         """
+        endpoint = "/v2/orders/history"
+        method = "GET"
+        params = {"page_size": page_size}
+        if start_time:
+            params["start_time"] = start_time
+        if after:
+            params["after"] = after
+        
+        ts, signature, full_path = self.generate_signature(method, endpoint, params=params)
+        
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "api-key": self.api_key,
+            "signature": signature,
+            "timestamp": ts
+        }
+        
         try:
-            method = 'GET'
-            timestamp = str(int(time.time()))
-            path = '/v2/orders/history/download/csv'
-            url = f'{self.base_url}{path}'
-            
-            end_time = int(time.time() * 1000000)
-            start_time = end_time - (30 * 24 * 60 * 60 * 1000000)
-            
-            query_string = f'?start_time={start_time}&end_time={end_time}'
-            payload = ''
-            
-            signature_data = method + timestamp + path + query_string + payload
-            signature = generate_signature(self.api_secret, signature_data)
-            
-            req_headers = {
-                'api-key': self.api_key,
-                'timestamp': timestamp,
-                'signature': signature,
-                'User-Agent': 'python-rest-client',
-                'Content-Type': 'application/json'
-            }
-            
-            query = {"start_time": start_time, "end_time": end_time}
-            
-            response = requests.request(
-                method, url, data=payload, params=query, timeout=10, headers=req_headers
+            response = self.http.get(
+                self.base_url + full_path,
+                headers=headers
             )
             
             if response.status_code == 200:
-                import csv
-                from io import StringIO
-                
-                csv_content = response.content.decode('utf-8')
-                csv_reader = csv.DictReader(StringIO(csv_content))
-                rows = list(csv_reader)
-                
-                if rows:
-                    # Find the most recent closed order
-                    closed_orders = [r for r in rows if r.get('Status') == 'closed']
-                    if closed_orders:
-                        # Get the most recent closed order (first in the list is most recent)
-                        last_closed = closed_orders[0]
-                        realized_pnl_str = last_closed.get('Realised P&L', '0')
-                        
-                        # Convert to float (remove commas if any)
-                        try:
-                            realized_pnl = float(realized_pnl_str.replace(',', ''))
-                            return round(realized_pnl, 2)
-                        except:
-                            return 0.0
-                return 0.0
+                data = response.json()
+                return {
+                    "success": True,
+                    "result": data.get('result', []),
+                    "after": (data.get('meta') or {}).get('after')
+                }
             else:
-                return 0.0
+                error_msg = f"{response.status_code} - {response.text}"
+                return {"error": error_msg, "success": False}
                 
         except Exception as e:
-            return 0.0
+            return {"error": str(e), "success": False}
 
 # ============ TRADING BOT CLASS ============
 
 class TradingBot:
-    def __init__(self):
+    def __init__(self, api=None, clock=time.time, start_threads=True, db_path='trading_config.db',
+                 notifier=send_telegram_alert, poll_min_interval=0.5, poll_max_interval=5.0,
+                 latency_clock=time.monotonic):
+        """
+        api, clock, notifier और db_path inject किए जा सकते हैं (replay harness के लिए)।
+        latency_clock: exit latency मापने की monotonic clock (replay में SimClock)।
+        poll_min_interval/poll_max_interval: REST fallback poller की adaptive cadence की सीमाएँ (seconds)।
+        start_threads=False पर कोई background thread/stream शुरू नहीं होता: price ticks subscribers
+        को inline मिलते हैं और exit countdown exit_timer.run_due(now) से चलता है।
+        """
         # Initialize API
-        self.api = DeltaExchangeAPI()
+        self.api = api or DeltaExchangeAPI()
+        self.clock = clock
+        self.latency_clock = latency_clock
+        self.notify = notifier
+        self.pnl_ledger = RealizedPnlLedger(self.api, db_path=db_path)
         
         # Log API key status for debugging
         if self.api.api_key:
@@ -655,22 +822,26 @@ class TradingBot:
         self.ip_verified = False
         self.position = {}
         self.price_vs_previous_close = "0.00%"
+        self.price_lock = threading.Lock()
+        self.price_events = PriceDispatcher(log=self.log_message, clock=clock, synchronous=not start_threads)
+        self.poll_cadence = AdaptivePollInterval(poll_min_interval, poll_max_interval)
+        self.level_sources = []
         
-        # Index exit parameters - UPDATED STRUCTURE
-        self.index_exit_params = {
-            'above': {'price': None, 'type': None},  # type: 'sl', 'target', or None
-            'below': {'price': None, 'type': None}
-        }
+        # Index exit parameters - versioned store; type: 'sl', 'target', or None
+        self.exit_levels = ExitLevelStore()
         
-        # BTC price alerts for trigger orders
-        self.btc_price_alerts = []
-        self.alerts_lock = threading.Lock()
+        # BTC price alerts - sorted index + SQLite, हर tick पर evaluate
+        self.btc_price_alerts = PriceAlertBook(db_path)
         self.stopped = False
         
         # Active orders tracking
         self.active_orders = {}
         self.position_orders = {'SL': None, 'Target': None}
         
+        # Fast exit path: dedicated workers + cross/fire-to-flat latency history
+        self.exit_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='exit')
+        self.exit_latencies = deque(maxlen=100)
+        
         # **ADD THIS: Initialize pending exit structure**
         self.pending_exit = {
             'active': False,
@@ -680,21 +851,38 @@ class TradingBot:
             'exit_type': None,
             'trigger_price': None,
             'cancelled': False,
-            'trigger_reason': None
+            'trigger_reason': None,
+            'crossed_at': None,
+            'fired_at': None
         }
         
-        # अलर्ट चेकिंग के लिए नया थ्रेड शुरू करें
-        self.alerts_thread = threading.Thread(target=self._check_price_alerts_loop, daemon=True)
-        self.alerts_thread.start()
+        # Exit countdown timer: ठीक end_time पर fire होता है, price evaluation block नहीं होता
+        self.exit_lock = threading.RLock()
+        self.exit_in_progress = False
+        self.exit_timer = DeadlineScheduler(self._on_exit_timer, clock=clock, name='exit-countdown')
         
-        # Schedule daily update at 05:30 AM IST
-        threading.Thread(target=self.auto_daily_refresh, daemon=True).start()
+        # Index exits हर price tick पर evaluate होते हैं (price dispatcher subscription)
+        self.price_events.subscribe('index_exit', self._on_index_exit_tick)
+        self.price_events.subscribe('btc_alerts', self._on_btc_alert_tick)
         
-        # Start threads
-        threading.Thread(target=self.update_live_price, daemon=True).start()
-        threading.Thread(target=self.fetch_current_ip, daemon=True).start()
-        threading.Thread(target=self.verify_ip_periodically, daemon=True).start()
-        threading.Thread(target=self.initialize_previous_close, daemon=True).start()
+        # WebSocket price stream (primary), REST polling fallback के साथ
+        self.price_stream = DeltaPriceStream(on_price=self._apply_price, log=self.log_message)
+        
+        if start_threads:
+            self.exit_timer.start()
+            
+            # Schedule daily update at 05:30 AM IST
+            threading.Thread(target=self.auto_daily_refresh, daemon=True).start()
+            
+            self.price_stream.start()
+            self.pnl_ledger.start()
+            
+            # Start threads
+            threading.Thread(target=self.update_live_price, daemon=True).start()
+            threading.Thread(target=self.fetch_current_ip, daemon=True).start()
+            threading.Thread(target=self.verify_ip_periodically, daemon=True).start()
+            threading.Thread(target=self.initialize_previous_close, daemon=True).start()
+            threading.Thread(target=self.keep_connection_warm, daemon=True).start()
         
         self.log_message("TradingBot initialized successfully.")
 
@@ -719,14 +907,17 @@ class TradingBot:
             # Get unrealized PNL from calculated method
             total_unrealized_pnl = self.api.get_unrealized_pnl_calculated()
             
-            # Get realized PNL from CSV
-            last_trade_realized_pnl = self.api.get_realized_pnl_from_csv()
+            # Realized PNL from the local ledger (synced in the background, no network here)
+            realized = self.pnl_ledger.summary()
+            last_trade_realized_pnl = realized['last_trade_realized_pnl']
             
             return {
                 "success": True,
                 "active_positions": active_positions,
                 "total_unrealized_pnl": total_unrealized_pnl,
                 "last_trade_realized_pnl": last_trade_realized_pnl,
+                "today_realized_pnl": realized['today_realized_pnl'],
+                "realized_pnl_30d": realized['realized_pnl_30d'],
                 "total_pnl": last_trade_realized_pnl + total_unrealized_pnl
             }
             
@@ -799,7 +990,7 @@ class TradingBot:
                             f"Time: {ist_now.strftime('%H:%M')} IST\n"
                             f"New day started for 24h change calculation."
                         )
-                        send_telegram_alert(message)
+                        self.notify(message)
                     
                     # Sleep for 1 hour to avoid multiple triggers
                     time.sleep(3600)
@@ -821,44 +1012,99 @@ class TradingBot:
         return (above_data and above_data.get('price') is not None) or \
                (below_data and below_data.get('price') is not None)
 
-    def start_exit_countdown(self, level, exit_type, trigger_price, trigger_reason):
+    def start_exit_countdown(self, level, exit_type, trigger_price, trigger_reason, crossed_at=None):
         """
         Start 7-second countdown before executing exit (WEBPAGE ONLY)
-        """
-        self.pending_exit = {
-            'active': True,
-            'countdown': 7,
-            'end_time': time.time() + 7,
-            'level': level,
-            'exit_type': exit_type,
-            'trigger_price': trigger_price,
-            'cancelled': False,
-            'trigger_reason': trigger_reason
-        }
+        crossed_at: level cross होने का latency_clock समय (exit latency यहीं से मापी जाती है)
+        """
+        with self.exit_lock:
+            end_time = self.clock() + 7
+            self.pending_exit = {
+                'active': True,
+                'countdown': 7,
+                'end_time': end_time,
+                'level': level,
+                'exit_type': exit_type,
+                'trigger_price': trigger_price,
+                'cancelled': False,
+                'trigger_reason': trigger_reason,
+                'crossed_at': crossed_at if crossed_at is not None else self.latency_clock(),
+                'fired_at': None
+            }
+            self.exit_timer.schedule('pending_exit', end_time, end_time)
         
         # Log but DON'T send Telegram notification for countdown
         self.log_message(f"Exit countdown started for {level} level at {trigger_price} ({exit_type})")
         self.log_message(f"Trigger reason: {trigger_reason}")
 
+    def escalate_pending_exit(self, level, exit_type, trigger_price, trigger_reason, crossed_at=None):
+        """
+        Countdown के दौरान दूसरी side का stop loss cross हुआ: pending exit उस level पर switch होता है
+        और countdown वहीं खत्म - exit_timer अभी fire होता है (tick thread block नहीं होता)।
+        Target/plain level का cross countdown नहीं बदलता (वह exit पहले से pending है)।
+        Cancel/execute की तरह exit_lock पर race करता है।
+        """
+        if exit_type != 'sl':
+            return False
+        with self.exit_lock:
+            pending = self.pending_exit
+            if not pending['active'] or pending['cancelled'] or self.exit_in_progress or pending['level'] == level:
+                return False
+            pending.update({
+                'level': level,
+                'exit_type': exit_type,
+                'trigger_price': trigger_price,
+                'trigger_reason': trigger_reason,
+                'crossed_at': crossed_at if crossed_at is not None else self.latency_clock(),
+                'end_time': self.clock()
+            })
+            self.exit_timer.schedule('pending_exit', pending['end_time'], pending['end_time'])
+        
+        self.log_message(f"Pending exit escalated to {level} level at {trigger_price} ({exit_type})")
+        self.log_message(f"Trigger reason: {trigger_reason}")
+        return True
+
     def cancel_pending_exit(self):
         """
         Cancel the pending exit countdown (WEBPAGE ONLY)
         """
-        if self.pending_exit['active'] and not self.pending_exit['cancelled']:
-            self.pending_exit['cancelled'] = True
-            self.pending_exit['active'] = False
-            
-            self.log_message(f"Pending exit cancelled by user")
-            return True
+        with self.exit_lock:
+            if self.exit_in_progress:
+                return False
+            if self.pending_exit['active'] and not self.pending_exit['cancelled']:
+                self.exit_timer.cancel('pending_exit')
+                self.pending_exit['cancelled'] = True
+                self.pending_exit['active'] = False
+                
+                self.log_message(f"Pending exit cancelled by user")
+                return True
         return False
     
+    def _on_exit_timer(self, due):
+        """Countdown timer callback - सिर्फ उसी countdown को execute करता है जिसका timer था"""
+        for _, end_time in due:
+            if self.pending_exit.get('end_time') == end_time:
+                self.execute_pending_exit()
+    
     def execute_pending_exit(self):
         """
         Execute the pending exit after countdown
         """
-        if not self.pending_exit['active'] or self.pending_exit['cancelled']:
-            return
+        # Cancel और execute एक ही lock पर race करते हैं - जो पहले आए वही जीतता है
+        with self.exit_lock:
+            if not self.pending_exit['active'] or self.pending_exit['cancelled'] or self.exit_in_progress:
+                return
+            self.exit_in_progress = True
+            self.pending_exit['fired_at'] = self.latency_clock()
+            self.exit_timer.cancel('pending_exit')
         
+        try:
+            self._run_pending_exit()
+        finally:
+            self.exit_in_progress = False
+    
+    def _run_pending_exit(self):
+        """Positions exit करके index levels और pending exit structure reset करता है"""
         # Get current price for the message
         current_price = self.live_price
         
@@ -870,7 +1116,9 @@ class TradingBot:
             'level': self.pending_exit['level'],
             'price': current_price,
             'timestamp': datetime.now().strftime('%H:%M:%S'),
-            'trigger_reason': self.pending_exit['trigger_reason']
+            'trigger_reason': self.pending_exit['trigger_reason'],
+            'crossed_at': self.pending_exit.get('crossed_at'),
+            'fired_at': self.pending_exit.get('fired_at')
         }
         
         # Log the execution
@@ -892,7 +1140,9 @@ class TradingBot:
             'exit_type': None,
             'trigger_price': None,
             'cancelled': False,
-            'trigger_reason': None
+            'trigger_reason': None,
+            'crossed_at': None,
+            'fired_at': None
         }
 
     
@@ -932,15 +1182,14 @@ class TradingBot:
             end_ts = int(utc_today.timestamp())
             
             # Fetch daily candles from Delta Exchange
-            response = requests.get(
+            response = transport.get(
                 "https://api.india.delta.exchange/v2/history/candles",
                 params={
                     "symbol": "BTCUSD",
                     "resolution": "1d",
                     "start": start_ts,
                     "end": end_ts
-                },
-                timeout=5
+                }
             )
             
             if response.status_code == 200:
@@ -959,7 +1208,7 @@ class TradingBot:
             try:
                 # Try to get public IP
                 try:
-                    response = requests.get("https://api64.ipify.org?format=json", timeout=5)
+                    response = transport.get("https://api64.ipify.org?format=json", timeout=5)
                     if response.status_code == 200:
                         ip_data = response.json()
                         self.current_ip = ip_data.get("ip", "Unknown")
@@ -1002,7 +1251,7 @@ class TradingBot:
                         f"<b>Current IP:</b> {self.current_ip}\n"
                         f"<b>Time:</b> {datetime.now().strftime('%H:%M:%S')}"
                     )
-                    threading.Thread(target=lambda: send_telegram_alert(telegram_msg), daemon=True).start()
+                    threading.Thread(target=lambda: self.notify(telegram_msg), daemon=True).start()
                 
                 # Check every 5 minutes
                 time.sleep(300)
@@ -1025,7 +1274,7 @@ class TradingBot:
         """
         url = "https://cdn.india.deltaex.org/v2/tickers/BTCUSD"
         try:
-            response = requests.get(url, timeout=5)
+            response = transport.get(url)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("success") and data.get("result") and data["result"].get("mark_price") is not None:
@@ -1040,7 +1289,7 @@ class TradingBot:
         Fallback method for BTC price fetching
         """
         try:
-            response = requests.get("https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT", timeout=5)
+            response = transport.get("https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT")
             if response.status_code == 200:
                 data = response.json()
                 return float(data['price'])
@@ -1049,14 +1298,62 @@ class TradingBot:
             self.log_message(f"Binance fallback error: {e}")
             return None
     
+    def _apply_price(self, btc_price):
+        """
+        नया BTC price live_price में लिखता है और change values अपडेट करता है।
+        WebSocket stream और REST poller दोनों इसे call करते हैं।
+        """
+        with self.price_lock:
+            # Store previous price for change calculation
+            self.previous_price = self.live_price
+            self.live_price = btc_price
+            
+            # Calculate price change
+            if self.previous_price > 0:
+                self.price_change = self.live_price - self.previous_price
+                self.price_change_percent = (self.price_change / self.previous_price) * 100
+            
+            # Calculate comparison with previous day close
+            if self.previous_day_close and self.previous_day_close > 0:
+                change_vs_previous = self.live_price - self.previous_day_close
+                percent_change = (change_vs_previous / self.previous_day_close) * 100
+                self.price_vs_previous_close = f"{percent_change:.2f}%"
+        
+        self.poll_cadence.observe(btc_price, self.clock())
+        
+        # हर tick सभी subscribers (index exits, trigger orders, ...) को publish करें
+        self.price_events.publish(btc_price)
+    
+    def add_level_source(self, source):
+        """source() -> (nearest above, nearest below) - adaptive polling इन levels को भी देखेगा"""
+        self.level_sources.append(source)
+    
+    def armed_levels(self):
+        """Index exits, BTC alerts और registered sources (जैसे trigger orders) के सभी nearest levels"""
+        levels = [
+            (self.index_exit_params.get('above') or {}).get('price'),
+            (self.index_exit_params.get('below') or {}).get('price')
+        ]
+        levels.extend(self.btc_price_alerts.index.nearest())
+        for source in self.level_sources:
+            try:
+                levels.extend(source())
+            except Exception as e:
+                self.log_message(f"Level source error: {e}")
+        return levels
+    
     def update_live_price(self):
         """
-        BTC की कीमत अपडेट करता है।
+        REST fallback poller - सिर्फ तब price fetch करता है जब WebSocket stream live नहीं है।
+        Poll interval nearest armed level की दूरी और realized volatility से adapt होता है।
         """
         while not self.stopped:
             try:
-                # Store previous price for change calculation
-                self.previous_price = self.live_price
+                if self.price_stream.is_live():
+                    self.poll_cadence.interval = None
+                    self.poll_cadence.reason = 'WebSocket stream live - REST polling paused'
+                    time.sleep(1)
+                    continue
                 
                 # Get new price
                 btc_price = self.fetch_btc_price()
@@ -1064,154 +1361,148 @@ class TradingBot:
                     btc_price = self.fetch_btc_price_fallback()
                 
                 if btc_price is not None:
-                    self.live_price = btc_price
-                    
-                    # Calculate price change
-                    if self.previous_price > 0:
-                        self.price_change = self.live_price - self.previous_price
-                        self.price_change_percent = (self.price_change / self.previous_price) * 100
-                    
-                    # Calculate comparison with previous day close
-                    if self.previous_day_close and self.previous_day_close > 0:
-                        change_vs_previous = self.live_price - self.previous_day_close
-                        percent_change = (change_vs_previous / self.previous_day_close) * 100
-                        self.price_vs_previous_close = f"{percent_change:.2f}%"
+                    self._apply_price(btc_price)
                 
-                time.sleep(2)
+                interval, _ = self.poll_cadence.next_interval(self.live_price, self.armed_levels())
+                time.sleep(interval)
                 
             except Exception as e:
                 self.log_message(f"Price update error: {str(e)}")
                 time.sleep(5)
     
-    def _check_price_alerts_loop(self):
+    def _on_index_exit_tick(self, tick):
         """
-        बैकग्राउंड में प्राइस अलर्ट और इंडेक्स एग्जिट की जाँच करता है।
+        हर price tick पर इंडेक्स एग्जिट की जाँच करता है।
+        Above level tick.high और below level tick.low से check होता है, ताकि पिछली
+        evaluation के बाद का कोई wick (जो वापस लौट आया हो) miss न हो।
+        Countdown pending हो तब भी evaluation चलती है: दूसरी side का level cross हो तो
+        pending exit उस level पर escalate होता है (escalate_pending_exit)।
         """
-        while not self.stopped:
+        current_price = tick.price
+        if not current_price:
+            return
+        crossed_at = self.latency_clock()
+        
+        # Above पहले, फिर below - दोनों एक tick में cross हों तो above level जीतता है
+        crossings = [crossing for crossing in (self._check_index_level('above', tick.high),
+                                               self._check_index_level('below', tick.low)) if crossing]
+        if not crossings:
+            return
+        
+        # Pending exit countdown चल रहा है (WEBPAGE ONLY) - exit_timer उसे end_time पर execute करेगा;
+        # उसी level का re-cross कुछ नहीं बदलता, दूसरी side का stop loss escalate करता है
+        if self.pending_exit['active'] and not self.pending_exit['cancelled']:
+            for level, exit_type, trigger_price, trigger_reason in crossings:
+                if level != self.pending_exit['level']:
+                    self.escalate_pending_exit(level, exit_type, trigger_price, trigger_reason, crossed_at=crossed_at)
+                    break
+            return
+        
+        level, exit_type, trigger_price, trigger_reason = crossings[0]
+        self.log_message(f"Index exit triggered ({level.capitalize()}): {trigger_reason}")
+        
+        # Start 7-second countdown (WEBPAGE ONLY)
+        self.start_exit_countdown(level, exit_type, trigger_price, trigger_reason, crossed_at=crossed_at)
+        
+        # Log for debugging
+        self.log_message(f"Exit countdown started for {level} at ${trigger_price}")
+    
+    def _check_index_level(self, side, price):
+        """
+        side ('above'/'below') का level price ने cross किया हो तो
+        (level, exit_type, trigger_price, trigger_reason), वरना None
+        """
+        data = self.index_exit_params.get(side)
+        if not data or data.get('price') is None:
+            return None
+        level_price = data['price']
+        if (side == 'above' and price < level_price) or (side == 'below' and price > level_price):
+            return None
+        
+        op = '>=' if side == 'above' else '<='
+        label = side.capitalize()
+        level_type = data.get('type', '')
+        if level_type == 'sl':
+            return side, 'sl', level_price, f"Stop Loss Hit! BTC price ${price:.2f} {op} ${level_price} ({label})"
+        if level_type == 'target':
+            return side, 'target', level_price, f"Target Hit! BTC price ${price:.2f} {op} ${level_price} ({label})"
+        return side, '', level_price, f"Exit {label} triggered! BTC price ${price:.2f} {op} ${level_price}"
+    
+    def _on_btc_alert_tick(self, tick):
+        """
+        हर price tick पर crossed BTC alerts निकालता है और Telegram पर background में भेजता है।
+        """
+        fired = self.btc_price_alerts.pop_crossed(tick.high, tick.low)
+        if not fired:
+            return
+        
+        messages = []
+        for alert in fired:
+            self.log_message(f"BTC alert fired: {alert['condition']} {alert['price']} (price {tick.price})")
+            messages.append(
+                f"🔔 <b>BTC Price Alert</b>\n"
+                f"BTC is {alert['condition']} ${alert['price']:,.2f}\n"
+                f"Current Price: ${tick.price:,.2f}"
+            )
+        
+        def send_all():
+            # Fired alerts की DB delete यहीं (notifier thread) - tick path disk commit का wait नहीं करता
             try:
-                current_price = self.live_price
-                if not current_price:
-                    time.sleep(5)
-                    continue
-                
-                # Check if there's a pending exit countdown (WEBPAGE ONLY)
-                if self.pending_exit['active'] and not self.pending_exit['cancelled']:
-                    current_time = time.time()
-                    
-                    # Check if countdown has finished
-                    if current_time >= self.pending_exit['end_time']:
-                        self.execute_pending_exit()
-                    else:
-                        # Just wait and continue checking
-                        time.sleep(1)
-                        continue
-                
-                # इंडेक्स बेस्ड एग्जिट की जाँच करें
-                above_data = self.index_exit_params.get('above')
-                below_data = self.index_exit_params.get('below')
-                
-                triggered = False
-                trigger_reason = ""
-                exit_type = ""  # 'sl', 'target', or ''
-                level = ""  # 'above' or 'below'
-                trigger_price = None
-                
-                # Above level check
-                if above_data and above_data.get('price') is not None and current_price >= above_data['price']:
-                    triggered = True
-                    level = 'above'
-                    trigger_price = above_data['price']
-                    level_type = above_data.get('type', '')
-                    if level_type == 'sl':
-                        trigger_reason = f"Stop Loss Hit! BTC price ${current_price:.2f} >= ${above_data['price']} (Above)"
-                        exit_type = 'sl'
-                    elif level_type == 'target':
-                        trigger_reason = f"Target Hit! BTC price ${current_price:.2f} >= ${above_data['price']} (Above)"
-                        exit_type = 'target'
-                    else:
-                        trigger_reason = f"Exit Above triggered! BTC price ${current_price:.2f} >= ${above_data['price']}"
-                    
-                    self.log_message(f"Index exit triggered (Above): {trigger_reason}")
-                
-                # Below level check (only if above not triggered)
-                if not triggered and below_data and below_data.get('price') is not None and current_price <= below_data['price']:
-                    triggered = True
-                    level = 'below'
-                    trigger_price = below_data['price']
-                    level_type = below_data.get('type', '')
-                    if level_type == 'sl':
-                        trigger_reason = f"Stop Loss Hit! BTC price ${current_price:.2f} <= ${below_data['price']} (Below)"
-                        exit_type = 'sl'
-                    elif level_type == 'target':
-                        trigger_reason = f"Target Hit! BTC price ${current_price:.2f} <= ${below_data['price']} (Below)"
-                        exit_type = 'target'
-                    else:
-                        trigger_reason = f"Exit Below triggered! BTC price ${current_price:.2f} <= ${below_data['price']}"
-                    
-                    self.log_message(f"Index exit triggered (Below): {trigger_reason}")
-                
-                if triggered and not self.pending_exit['active']:
-                    # Start 7-second countdown (WEBPAGE ONLY)
-                    self.start_exit_countdown(level, exit_type, trigger_price, trigger_reason)
-                    
-                    # Log for debugging
-                    self.log_message(f"Exit countdown started for {level} at ${trigger_price}")
-                    
-                    # Wait for countdown to finish
-                    time.sleep(7)
-                    
+                self.btc_price_alerts.delete_fired(fired)
             except Exception as e:
-                self.log_message(f"Error in alert checking loop: {e}")
-                time.sleep(10)
+                self.log_message(f"BTC alert delete error: {e}")
+            for message in messages:
+                self.notify(message)
+        threading.Thread(target=send_all, daemon=True).start()
     
     def add_btc_alert(self, price, condition):
         """
         BTC प्राइस अलर्ट जोड़ता है।
         """
-        with self.alerts_lock:
-            alert_id = str(uuid.uuid4())
-            self.btc_price_alerts.append({'id': alert_id, 'price': float(price), 'condition': condition})
-            self.log_message(f"New BTC alert set: {condition} {price}")
-        return {'success': True, 'id': alert_id}
+        try:
+            alert = self.btc_price_alerts.add(price, condition)
+        except (ValueError, TypeError) as e:
+            return {'success': False, 'error': str(e)}
+        self.log_message(f"New BTC alert set: {condition} {price}")
+        return {'success': True, 'id': alert['id']}
     
     def get_btc_alerts(self):
         """
         सभी BTC प्राइस अलर्ट्स प्राप्त करता है।
         """
-        with self.alerts_lock:
-            return self.btc_price_alerts
+        return self.btc_price_alerts.all()
     
     def delete_btc_alert(self, alert_id):
         """
         एक BTC प्राइस अलर्ट डिलीट करता है।
         """
-        with self.alerts_lock:
-            initial_len = len(self.btc_price_alerts)
-            self.btc_price_alerts = [a for a in self.btc_price_alerts if a['id'] != alert_id]
-            if len(self.btc_price_alerts) < initial_len:
-                self.log_message(f"BTC alert {alert_id} deleted.")
-                return {'success': True}
+        if self.btc_price_alerts.remove(alert_id):
+            self.log_message(f"BTC alert {alert_id} deleted.")
+            return {'success': True}
         return {'success': False, 'error': 'Alert not found'}
     
+    @property
+    def index_exit_params(self):
+        """Current exit levels (read-only dict, हर change पर नया)"""
+        return self.exit_levels.levels
+
+    @index_exit_params.setter
+    def index_exit_params(self, levels):
+        self.exit_levels.load(levels)
+
     def set_index_exit_params(self, above_price=None, below_price=None, above_type=None, below_type=None):
         """
         इंडेक्स एक्जिट पैरामीटर्स सेट करता है - UPDATED VERSION।
         type: 'sl', 'target', or None
         """
         try:
-            if above_price is not None:
-                self.index_exit_params['above']['price'] = float(above_price)
-                self.index_exit_params['above']['type'] = above_type
-            else:
-                self.index_exit_params['above'] = {'price': None, 'type': None}
-                
-            if below_price is not None:
-                self.index_exit_params['below']['price'] = float(below_price)
-                self.index_exit_params['below']['type'] = below_type
-            else:
-                self.index_exit_params['below'] = {'price': None, 'type': None}
-                
+            version = self.exit_levels.set(above_price, above_type, below_price, below_type)
             self.log_message(f"Index exit levels updated: Above={self.index_exit_params['above']}, Below={self.index_exit_params['below']}")
+            if not self.exit_levels.persisted:
+                # Memory में active हैं, पर DB में नहीं - restart पर पुराने levels लौटेंगे
+                error = f"Exit levels v{version} are active but could not be saved to the database"
+                self.log_message(error)
+                return {'success': False, 'error': error}
             return {'success': True}
         except Exception as e:
             self.log_message(f"Error setting index exit params: {e}")
@@ -1241,30 +1532,72 @@ class TradingBot:
             self.log_message(f"Error getting position details: {str(e)}")
             return None
     
+    def keep_connection_warm(self, interval=20):
+        """Exchange connection pool को warm रखता है ताकि exit पर handshake latency न लगे"""
+        while not self.stopped:
+            self.api.warm_up()
+            time.sleep(interval)
+    
+    def _cancel_open_orders_concurrently(self):
+        """Bulk cancel fail होने पर fallback - सभी open orders concurrent cancel"""
+        open_orders_response = self.api.get_open_orders()
+        if not open_orders_response or not open_orders_response.get('success'):
+            return 0
+        order_ids = [o.get('id') for o in open_orders_response.get('result', []) if o.get('id')]
+        cancelled = 0
+        for order_id, result in zip(order_ids, self.exit_executor.map(self.api.cancel_order, order_ids)):
+            if result.get('success'):
+                cancelled += 1
+                self.log_message(f"Cancelled order: {order_id}")
+        return cancelled
+    
     def exit_all_positions(self, exit_details=None):
         """
         सभी पोजीशन्स और ऑर्डर्स बंद करता है।
-        """
+        Square-off तुरंत भेजा जाता है, orders का bulk cancel उसके साथ parallel चलता है।
+        Latency latency_clock पर मापी जाती है: flat_ms countdown fire (manual exit पर इस call) से,
+        cross_to_flat_ms level cross से (countdown सहित)।
+        """
+        exit_details = exit_details or {}
+        started_at = self.latency_clock()
+        fired_at = exit_details.get('fired_at')
+        if fired_at is None:
+            fired_at = started_at
+        crossed_at = exit_details.get('crossed_at')
         try:
             # Log exit details
             if exit_details:
                 self.log_message(f"Exit triggered: {exit_details.get('message', 'No details')}")
-                
-            # सभी ऑर्डर्स कैंसल करें
+            
+            # सभी पोजीशन्स बंद करें और साथ ही सभी ऑर्डर्स कैंसल करें
+            close_future = self.exit_executor.submit(self.api.square_off_all)
+            cancel_future = self.exit_executor.submit(self.api.cancel_all_orders)
+            
+            close_response = close_future.result()
+            flat_at = self.latency_clock()
+            flat_ms = (flat_at - fired_at) * 1000
+            
             try:
-                open_orders_response = self.api.get_open_orders()
-                if open_orders_response and open_orders_response.get('success'):
-                    open_orders = open_orders_response.get('result', [])
-                    for order in open_orders:
-                        order_id = order.get('id')
-                        if order_id:
-                            self.api.cancel_order(order_id)
-                            self.log_message(f"Cancelled order: {order_id}")
+                cancel_response = cancel_future.result()
+                if not cancel_response or "error" in cancel_response:
+                    self.log_message(f"Bulk cancel failed ({(cancel_response or {}).get('error', 'No response')}), cancelling individually")
+                    self._cancel_open_orders_concurrently()
+                else:
+                    self.log_message("All open orders cancelled")
             except Exception as e:
                 self.log_message(f"Error cancelling orders: {str(e)}")
-                
-            # सभी पोजीशन्स बंद करें
-            close_response = self.api.square_off_all()
+            cancel_ms = (self.latency_clock() - fired_at) * 1000
+            
+            self.exit_latencies.append({
+                'at': self.clock(),
+                'reason': exit_details.get('trigger_reason') or exit_details.get('message', 'manual'),
+                'flat_ms': round(flat_ms, 1),
+                'cross_to_flat_ms': round((flat_at - crossed_at) * 1000, 1) if crossed_at is not None else None,
+                'orders_cancelled_ms': round(cancel_ms, 1),
+                'success': bool(close_response and "error" not in close_response)
+            })
+            self.log_message(f"Exit latency: flat in {flat_ms:.0f}ms, orders cancelled in {cancel_ms:.0f}ms")
+            
             if close_response and "error" not in close_response:
                 self.log_message("All positions closed successfully")
                 
@@ -1280,10 +1613,11 @@ class TradingBot:
                     notification_message += f"<b>Reason:</b> {exit_details.get('trigger_reason', 'Index Exit')}\n"
                     notification_message += f"<b>BTC Price:</b> ${exit_details.get('price', 0):.2f}\n"
                     notification_message += f"<b>Time:</b> {datetime.now().strftime('%H:%M:%S')}\n"
+                    notification_message += f"<b>Time to flat:</b> {flat_ms:.0f} ms after countdown\n"
                     notification_message += "All positions closed and orders cancelled."
                     
                     # Send Telegram notification
-                    threading.Thread(target=lambda: send_telegram_alert(notification_message), daemon=True).start()
+                    threading.Thread(target=lambda: self.notify(notification_message), daemon=True).start()
                 
             else:
                 error = close_response.get('error', 'Unknown error') if close_response else "No response"
@@ -1293,6 +1627,8 @@ class TradingBot:
             self.position_orders = {'SL': None, 'Target': None}
             self.active_orders = {}
             self.position = {}
+            # Exit से बने closed orders ledger में जल्दी आएँ
+            self.pnl_ledger.request_sync()
             # ✅ NEW ADDITION: If this exit was triggered by index levels, clear them.
             if exit_details and 'level' in exit_details:
                 self.set_index_exit_params(above_price=None, below_price=None, above_type=None, below_type=None)
@@ -1300,6 +1636,21 @@ class TradingBot:
     
         except Exception as e:
             self.log_message(f"Exit All Error: {str(e)}")
+    
+    def get_exit_latency_stats(self):
+        """पिछले exits का fire-to-flat (flat_ms) और cross-to-flat latency history"""
+        records = list(self.exit_latencies)
+        flat = sorted(r['flat_ms'] for r in records)
+        cross = sorted(r['cross_to_flat_ms'] for r in records if r.get('cross_to_flat_ms') is not None)
+        return {
+            'count': len(records),
+            'last': records[-1] if records else None,
+            'flat_ms_p50': flat[len(flat) // 2] if flat else None,
+            'flat_ms_max': flat[-1] if flat else None,
+            'cross_to_flat_ms_p50': cross[len(cross) // 2] if cross else None,
+            'cross_to_flat_ms_max': cross[-1] if cross else None,
+            'history': records[-20:]
+        }
 
 
     # ============ COMPATIBILITY METHODS ============
@@ -1326,11 +1677,14 @@ class TradingBot:
         """
         Wrapper method for telegram alerts to maintain backward compatibility
         """
-        return send_telegram_alert(message)
+        return self.notify(message)
     
     def stop(self):
         """
         बॉट के सभी चल रहे थ्रेड्स को रोकने के लिए।
         """
         self.stopped = True
+        self.price_stream.stop()
+        self.price_events.stop()
+        self.exit_timer.stop()
         self.log_message("TradingBot stopping all threads...")
\ No newline at end of file
@@ -0,0 +1,95 @@
+# exit_levels.py
+# Versioned in-memory index exit levels: lock-free reads, synchronous write-through with lag tracking
+import threading
+import uuid
+
+EMPTY_LEVEL = {'price': None, 'type': None}
+
+
+def _level(price, level_type):
+    if price is None:
+        return dict(EMPTY_LEVEL)
+    return {'price': float(price), 'type': level_type}
+
+
+class ExitLevelStore:
+    """
+    Index exit levels (above/below) का authoritative copy।
+    - levels dict copy-on-write है: हर change नया dict बनाकर swap करता है, इसलिए reads बिना
+      lock और बिना I/O के होते हैं (returned dict को mutate न करें)
+    - हर change पर version बढ़ता है; HTTP ETag = epoch + version (restart पर पुराना ETag match न हो)
+    - persister(version, levels) -> bool हर change पर lock के अंदर call होता है (SQLite write-through);
+      सफल हुआ तो persisted_version आगे बढ़ता है। Fail हो तो persisted False रहता है और अगला
+      set() - levels same हों तब भी - current levels फिर persist करता है
+    - listeners(version, levels) हर change पर call होते हैं (fast रखें)
+    """
+
+    def __init__(self, levels=None):
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._persister = None
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.persisted_version = 0
+        self.levels = self._normalize(levels)
+
+    @staticmethod
+    def _normalize(levels):
+        levels = levels or {}
+        return {
+            side: _level((levels.get(side) or {}).get('price'), (levels.get(side) or {}).get('type'))
+            for side in ('above', 'below')
+        }
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def set_persister(self, persister):
+        self._persister = persister
+
+    @property
+    def persisted(self):
+        """Current version storage में है (persister न हो तो हमेशा True)"""
+        return self._persister is None or self.persisted_version >= self.version
+
+    def snapshot(self):
+        """(version, levels) एक consistent pair"""
+        with self._lock:
+            return self.version, self.levels
+
+    def load(self, levels):
+        """Startup पर DB से आए levels - listeners notify नहीं होते, version पहले से persisted है"""
+        with self._lock:
+            self.levels = self._normalize(levels)
+            self.version += 1
+            self.persisted_version = self.version
+
+    def set(self, above_price=None, above_type=None, below_price=None, below_type=None):
+        """दोनों levels एक साथ set करता है (price None = वह level clear); नया version return करता है"""
+        levels = {'above': _level(above_price, above_type), 'below': _level(below_price, below_type)}
+        with self._lock:
+            if levels == self.levels:
+                if not self.persisted:
+                    # पिछली write fail हुई थी - वही levels दोबारा persist करें
+                    self._persist()
+                return self.version
+            self.levels = levels
+            self.version += 1
+            # Lock के अंदर persist/notify ताकि writes उसी क्रम में हों जिसमें versions बने
+            self._persist()
+            for listener in self._listeners:
+                try:
+                    listener(self.version, levels)
+                except Exception as e:
+                    print(f"Exit level listener error: {e}")
+            return self.version
+
+    def _persist(self):
+        if self._persister is None:
+            return
+        version, levels = self.version, self.levels
+        try:
+            if self._persister(version, levels):
+                self.persisted_version = version
+        except Exception as e:
+            print(f"Exit level persist error (v{version}): {e}")
@@ -0,0 +1,137 @@
+# http_transport.py
+# Shared keep-alive HTTP transport for Delta Exchange, Binance and Telegram calls
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import registry, endpoint_label
+
+# (connect, read) timeouts - longest matching path prefix wins
+DEFAULT_TIMEOUT = (3.05, 10)
+ENDPOINT_TIMEOUTS = {
+    '/v2/orders': (3.05, 10),
+    '/v2/orders/history': (3.05, 20),
+    '/v2/positions': (3.05, 10),
+    '/v2/tickers': (3.05, 5),
+    '/v2/wallet': (3.05, 10),
+    '/v2/history/candles': (3.05, 5),
+    '/api/v3/ticker': (3.05, 5),
+    '/bot': (3.05, 5),
+}
+
+# सिर्फ idempotent methods retry होते हैं - POST/DELETE (orders) कभी नहीं
+RETRYABLE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+
+def timeout_for(url):
+    """URL के path से per-endpoint (connect, read) timeout चुनता है।"""
+    path = urllib.parse.urlsplit(url).path
+    best = None
+    for prefix in ENDPOINT_TIMEOUTS:
+        if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return ENDPOINT_TIMEOUTS[best] if best else DEFAULT_TIMEOUT
+
+
+class HttpTransport:
+    """
+    requests.Session के ऊपर एक pooled transport।
+    हर host के लिए persistent connections रखता है ताकि हर call पर नया TCP+TLS handshake न हो।
+    """
+
+    def __init__(self, pool_connections=8, pool_maxsize=16, retries=2, backoff_factor=0.2):
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=RETRYABLE_METHODS,
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+
+    def timeout_for(self, url):
+        return timeout_for(url)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout_for(url)
+        with self._lock:
+            self.request_count += 1
+        endpoint = endpoint_label(method, url)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=timeout, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self.error_count += 1
+            registry.observe(endpoint, time.perf_counter() - start, error=type(e).__name__,
+                             timeout=isinstance(e, requests.exceptions.Timeout))
+            raise
+        registry.observe(endpoint, time.perf_counter() - start, status=response.status_code)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def get_stats(self):
+        """
+        Pool reuse statistics - हर host के लिए कितने connections खुले और कितनी requests चलीं।
+        """
+        hosts = []
+        total_requests = 0
+        total_connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            total_requests += pool.num_requests
+            total_connections += pool.num_connections
+            hosts.append({
+                'host': pool.host,
+                'port': pool.port,
+                'requests': pool.num_requests,
+                'connections_opened': pool.num_connections,
+                'idle_connections': sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            })
+
+        reused = max(total_requests - total_connections, 0)
+        return {
+            'requests': self.request_count,
+            'errors': self.error_count,
+            'connections_opened': total_connections,
+            'connections_reused': reused,
+            'reuse_ratio': round(reused / total_requests, 3) if total_requests else 0.0,
+            'hosts': hosts
+        }
+
+    def close(self):
+        self.session.close()
+
+
+# Process-wide shared transport
+transport = HttpTransport()
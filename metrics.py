@@ -0,0 +1,187 @@
+# metrics.py
+# Per-endpoint latency histograms for outbound calls, exported in Prometheus text format
+import re
+import threading
+import time
+import urllib.parse
+from collections import deque
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+SAMPLE_WINDOW = 1024
+
+HOST_ALIASES = {
+    'api.india.delta.exchange': 'delta',
+    'cdn.india.deltaex.org': 'delta_cdn',
+    'api.telegram.org': 'telegram',
+    'api.binance.com': 'binance',
+    'api64.ipify.org': 'ipify',
+}
+
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-f]{8}-[0-9a-f-]{27,}|[0-9a-f]{32})$', re.IGNORECASE)
+
+
+def endpoint_label(method, url):
+    """
+    URL से low-cardinality endpoint label बनाता है, जैसे 'delta POST /v2/orders'।
+    Numeric/uuid path segments {id} बनते हैं और Telegram bot token हटाया जाता है।
+    """
+    parts = urllib.parse.urlsplit(url)
+    host = HOST_ALIASES.get(parts.hostname, parts.hostname or 'local')
+    segments = []
+    for segment in parts.path.split('/'):
+        if segment.startswith('bot') and ':' in segment:
+            continue
+        segments.append('{id}' if _ID_SEGMENT.match(segment) else segment)
+    path = '/'.join(segments) or '/'
+    if not path.startswith('/'):
+        path = '/' + path
+    return f"{host} {method.upper()} {path}"
+
+
+class EndpointStats:
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = {}      # status code / exception name -> count
+        self.timeouts = 0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: None for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """
+    Outbound calls का latency/error registry।
+    हर endpoint के लिए histogram buckets, recent-window p50/p95/p99, status code errors और timeouts रखता है।
+    """
+
+    def __init__(self, prefix='btcoptiontrader'):
+        self.prefix = prefix
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint):
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = EndpointStats()
+        return stats
+
+    def observe(self, endpoint, seconds, status=None, error=None, timeout=False):
+        """
+        एक call record करता है। status >= 400 या error (exception name) error count बढ़ाते हैं।
+        """
+        with self._lock:
+            stats = self._get(endpoint)
+            stats.observe(seconds)
+            if timeout:
+                stats.timeouts += 1
+            if error:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+            elif status is not None and status >= 400:
+                key = str(status)
+                stats.errors[key] = stats.errors.get(key, 0) + 1
+
+    @contextmanager
+    def timer(self, endpoint):
+        """Non-HTTP calls (जैसे option_trader methods) को time करने के लिए"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.observe(endpoint, time.perf_counter() - start, error=type(e).__name__,
+                         timeout='Timeout' in type(e).__name__)
+            raise
+        else:
+            self.observe(endpoint, time.perf_counter() - start)
+
+    def timed(self, endpoint, fn):
+        """fn को wrap करता है ताकि हर call timer से record हो"""
+        def wrapper(*args, **kwargs):
+            with self.timer(endpoint):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for endpoint, stats in self._stats.items():
+                q = stats.quantiles()
+                result[endpoint] = {
+                    'count': stats.count,
+                    'avg_ms': round(stats.total / stats.count * 1000, 2) if stats.count else None,
+                    'p50_ms': round(q[0.5] * 1000, 2) if q[0.5] is not None else None,
+                    'p95_ms': round(q[0.95] * 1000, 2) if q[0.95] is not None else None,
+                    'p99_ms': round(q[0.99] * 1000, 2) if q[0.99] is not None else None,
+                    'errors': dict(stats.errors),
+                    'timeouts': stats.timeouts
+                }
+            return result
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        p = self.prefix
+        latency = f"{p}_outbound_request_duration_seconds"
+        quantile = f"{p}_outbound_request_duration_quantile_seconds"
+        errors = f"{p}_outbound_request_errors_total"
+        timeouts = f"{p}_outbound_request_timeouts_total"
+
+        with self._lock:
+            items = sorted(self._stats.items())
+            lines = [
+                f"# HELP {latency} Latency of outbound calls by endpoint.",
+                f"# TYPE {latency} histogram"
+            ]
+            for endpoint, stats in items:
+                label = f'endpoint="{_escape(endpoint)}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{latency}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{latency}_bucket{{{label},le="+Inf"}} {stats.count}')
+                lines.append(f'{latency}_sum{{{label}}} {stats.total:.6f}')
+                lines.append(f'{latency}_count{{{label}}} {stats.count}')
+
+            lines.append(f"# HELP {quantile} Recent-window latency quantiles of outbound calls.")
+            lines.append(f"# TYPE {quantile} gauge")
+            for endpoint, stats in items:
+                for q, value in stats.quantiles().items():
+                    if value is not None:
+                        lines.append(f'{quantile}{{endpoint="{_escape(endpoint)}",quantile="{q}"}} {value:.6f}')
+
+            lines.append(f"# HELP {errors} Failed outbound calls by endpoint and status code or exception.")
+            lines.append(f"# TYPE {errors} counter")
+            for endpoint, stats in items:
+                for status, count in sorted(stats.errors.items()):
+                    lines.append(f'{errors}{{endpoint="{_escape(endpoint)}",status="{_escape(status)}"}} {count}')
+
+            lines.append(f"# HELP {timeouts} Timed-out outbound calls by endpoint.")
+            lines.append(f"# TYPE {timeouts} counter")
+            for endpoint, stats in items:
+                lines.append(f'{timeouts}{{endpoint="{_escape(endpoint)}"}} {stats.timeouts}')
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+registry = MetricsRegistry()
@@ -0,0 +1,142 @@
+# migrations.py
+# Versioned schema for trading_config.db: ordered migrations + trigger order archive compaction
+import time
+
+ORDER_COLUMNS = (
+    'id', 'symbol', 'product_id', 'side', 'size', 'trigger_price', 'trigger_condition',
+    'mark_price', 'total_cost', 'time_limit', 'expires_at', 'created_at', 'status',
+    'executed_at', 'order_id'
+)
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _baseline(conn):
+    """v1: पुराने init_db वाली tables (existing DB पर no-op)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS index_exit_levels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            above_price REAL,
+            above_type TEXT,
+            below_price REAL,
+            below_type TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pending_trigger_orders (
+            id TEXT PRIMARY KEY,
+            symbol TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            side TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            trigger_price REAL NOT NULL,
+            trigger_condition TEXT NOT NULL,
+            mark_price REAL,
+            total_cost REAL,
+            time_limit INTEGER,
+            expires_at REAL,
+            created_at TEXT,
+            status TEXT DEFAULT 'pending'
+        )
+    ''')
+
+
+def _add_execution_columns(conn):
+    """v2: executed order का time और exchange order id"""
+    existing = _columns(conn, 'pending_trigger_orders')
+    for column in ('executed_at', 'order_id'):
+        if column not in existing:
+            conn.execute(f'ALTER TABLE pending_trigger_orders ADD COLUMN {column} TEXT')
+
+
+def _add_order_indexes(conn):
+    """v3: startup load (status = 'pending') और expiry scan के लिए indexes"""
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_trigger_orders_status_level
+        ON pending_trigger_orders (status, trigger_condition, trigger_price)
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_trigger_orders_expires_at ON pending_trigger_orders (expires_at)')
+
+
+def _add_order_archive(conn):
+    """v4: executed/failed/expired orders की archive table"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pending_trigger_orders_archive (
+            id TEXT PRIMARY KEY,
+            symbol TEXT,
+            product_id INTEGER,
+            side TEXT,
+            size INTEGER,
+            trigger_price REAL,
+            trigger_condition TEXT,
+            mark_price REAL,
+            total_cost REAL,
+            time_limit INTEGER,
+            expires_at REAL,
+            created_at TEXT,
+            status TEXT,
+            executed_at TEXT,
+            order_id TEXT,
+            archived_at REAL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_trigger_archive_status ON pending_trigger_orders_archive (status)')
+
+
+# (version, description, apply(conn)) - सिर्फ नीचे append करें, पुरानी migrations कभी न बदलें
+MIGRATIONS = [
+    (1, 'baseline index_exit_levels and pending_trigger_orders', _baseline),
+    (2, 'add executed_at and order_id to pending_trigger_orders', _add_execution_columns),
+    (3, 'index pending_trigger_orders on status/level and expires_at', _add_order_indexes),
+    (4, 'add pending_trigger_orders_archive', _add_order_archive),
+]
+
+
+def current_version(db):
+    with db.transaction() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    row = db.query_one('SELECT MAX(version) FROM schema_version')
+    return row[0] or 0
+
+
+def migrate(db, migrations=MIGRATIONS, log=print):
+    """
+    Pending migrations क्रम से apply करता है - हर migration और उसकी schema_version row
+    एक ही transaction में, इसलिए बीच में crash होने पर वही migration अगली बार फिर चलती है।
+    Final version return करता है।
+    """
+    version = current_version(db)
+    for number, description, apply in migrations:
+        if number <= version:
+            continue
+        with db.transaction() as conn:
+            apply(conn)
+            conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                         (number, description))
+        log(f"🗄️ Applied migration {number}: {description}")
+        version = number
+    return version
+
+
+def compact_trigger_orders(db, clock=time.time):
+    """
+    Non-pending rows (executed/failed/expired) archive table में move करता है ताकि
+    pending_trigger_orders में सिर्फ live orders रहें। Archived rows की संख्या return करता है।
+    """
+    columns = ', '.join(ORDER_COLUMNS)
+    where = "status != 'pending'"
+    with db.transaction() as conn:
+        conn.execute(f'''
+            INSERT OR REPLACE INTO pending_trigger_orders_archive ({columns}, archived_at)
+            SELECT {columns}, ? FROM pending_trigger_orders WHERE {where}
+        ''', (clock(),))
+        return conn.execute(f'DELETE FROM pending_trigger_orders WHERE {where}').rowcount
@@ -0,0 +1,249 @@
+# option_chain.py
+# Indexed option chain and cache shared by the options routes
+import threading
+import time
+
+import numpy as np
+
+CONTRACT_KINDS = {'call_options': 'call', 'put_options': 'put'}
+GREEK_KEYS = ('delta', 'gamma', 'theta', 'vega', 'rho')
+
+# Auto-find delta band for Calls / Puts / Straddle
+DELTA_BAND = (0.44, 0.58)
+
+
+def _to_float(value):
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return value
+
+
+def parse_strike(option):
+    """Option का strike - strike_price field से, नहीं तो symbol (C-BTC-Strike-Expiry) से।"""
+    strike = option.get('strike_price')
+    if strike in (None, ''):
+        parts = (option.get('symbol') or '').split('-')
+        strike = parts[2] if len(parts) >= 3 else None
+    try:
+        return float(strike)
+    except (TypeError, ValueError):
+        return None
+
+
+class OptionChain:
+    """
+    एक expiry की chain, refresh के समय एक बार parse और indexed।
+    symbol, (strike, 'call'/'put') और product_id से O(1) lookup देता है,
+    और strike/mark/greeks के NumPy columns पर delta-band selection array operations से करता है।
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.by_symbol = {}
+        self.by_product_id = {}
+        self.by_strike_kind = {}
+        self.strike_of = {}
+
+        nan = float('nan')
+        strikes = []
+        marks = []
+        greek_cols = {key: [] for key in GREEK_KEYS}
+        kinds = []
+
+        for opt in options:
+            # String values को एक बार float में normalize करें (in place, JSON shape वही रहता है)
+            mark = None
+            if 'mark_price' in opt:
+                mark = opt['mark_price'] = _to_float(opt['mark_price'])
+            marks.append(nan if mark is None else mark)
+
+            greeks = opt.get('greeks')
+            if not isinstance(greeks, dict):
+                greeks = {}
+            for key in GREEK_KEYS:
+                value = None
+                if key in greeks:
+                    value = greeks[key] = _to_float(greeks[key])
+                greek_cols[key].append(nan if value is None else value)
+
+            symbol = opt.get('symbol')
+            strike = parse_strike(opt)
+            kind = CONTRACT_KINDS.get(opt.get('contract_type'))
+            strikes.append(nan if strike is None else strike)
+            kinds.append(kind)
+
+            if symbol:
+                self.by_symbol[symbol] = opt
+                self.strike_of[symbol] = strike
+            if opt.get('product_id'):
+                self.by_product_id[opt['product_id']] = opt
+            if strike is not None and kind:
+                self.by_strike_kind[(strike, kind)] = opt
+
+        self.strike = np.array(strikes, dtype=float)
+        self.mark = np.array(marks, dtype=float)
+        self.greeks = {key: np.array(col, dtype=float) for key, col in greek_cols.items()}
+        kind_arr = np.array(kinds, dtype=object)
+        self.is_call = kind_arr == 'call'
+        self.is_put = kind_arr == 'put'
+
+    # ============ VECTORIZED SELECTION ============
+
+    def delta_band_mask(self, kind, delta_min=DELTA_BAND[0], delta_max=DELTA_BAND[1]):
+        """kind ('call'/'put') के वो contracts जिनका |delta| band में है (delta 0/missing नहीं)"""
+        type_mask = self.is_call if kind == 'call' else self.is_put
+        abs_delta = np.abs(self.greeks['delta'])
+        with np.errstate(invalid='ignore'):
+            return type_mask & (abs_delta > 0) & (abs_delta >= delta_min) & (abs_delta <= delta_max)
+
+    def eligible(self, kind, delta_min=DELTA_BAND[0], delta_max=DELTA_BAND[1]):
+        return [self.options[i] for i in np.flatnonzero(self.delta_band_mask(kind, delta_min, delta_max))]
+
+    def select_max_delta(self, kind, delta_min=DELTA_BAND[0], delta_max=DELTA_BAND[1]):
+        """
+        Band में सबसे ज़्यादा delta वाला contract - Calls के लिए delta, Puts के लिए |delta|।
+        कोई eligible न हो तो None।
+        """
+        mask = self.delta_band_mask(kind, delta_min, delta_max)
+        if not mask.any():
+            return None
+        delta = self.greeks['delta'] if kind == 'call' else np.abs(self.greeks['delta'])
+        return self.options[int(np.argmax(np.where(mask, delta, -np.inf)))]
+
+    def straddle_pairs(self, delta_min=DELTA_BAND[0], delta_max=DELTA_BAND[1]):
+        """
+        Band में eligible call और put जिनका strike same है।
+        Returns: [(strike, call, put), ...] strike के ascending order में
+        """
+        call_idx = np.flatnonzero(self.delta_band_mask('call', delta_min, delta_max))
+        put_idx = np.flatnonzero(self.delta_band_mask('put', delta_min, delta_max))
+        strikes, call_pos, put_pos = np.intersect1d(
+            self.strike[call_idx], self.strike[put_idx], return_indices=True
+        )
+        return [
+            (float(strike), self.options[call_idx[c]], self.options[put_idx[p]])
+            for strike, c, p in zip(strikes, call_pos, put_pos)
+            if not np.isnan(strike)
+        ]
+
+    def get(self, symbol):
+        return self.by_symbol.get(symbol)
+
+    def get_by_product_id(self, product_id):
+        return self.by_product_id.get(product_id)
+
+    def get_by_strike(self, strike, kind):
+        """kind: 'call' या 'put'"""
+        return self.by_strike_kind.get((float(strike), kind))
+
+    def __iter__(self):
+        return iter(self.options)
+
+    def __len__(self):
+        return len(self.options)
+
+
+class OptionChainCache:
+    """
+    Expiry के हिसाब से option chain cache करता है।
+    - ttl के अंदर cached chain सीधे return होती है
+    - ttl के बाद stale_ttl तक stale chain return होती है और background में refresh होता है
+    - एक ही expiry के concurrent misses एक ही upstream fetch share करते हैं (single-flight)
+    Cached value एक indexed OptionChain है।
+    """
+
+    def __init__(self, fetch_chain, ttl=5, stale_ttl=60):
+        self.fetch_chain = fetch_chain
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._entries = {}    # expiry -> (fetched_at, chain)
+        self._inflight = {}   # expiry -> threading.Event
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+
+    def get(self, expiry):
+        """Expiry की OptionChain return करता है; fetch fail होने पर None।"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(expiry)
+            if entry:
+                age = now - entry[0]
+                if age <= self.ttl:
+                    self.hits += 1
+                    return entry[1]
+                if age <= self.stale_ttl:
+                    # Stale-while-revalidate
+                    self.stale_hits += 1
+                    if expiry not in self._inflight:
+                        self._inflight[expiry] = threading.Event()
+                        threading.Thread(target=self._refresh, args=(expiry,), daemon=True).start()
+                    return entry[1]
+
+            self.misses += 1
+            event = self._inflight.get(expiry)
+            leader = event is None
+            if leader:
+                event = self._inflight[expiry] = threading.Event()
+
+        if leader:
+            return self._refresh(expiry)
+
+        event.wait()
+        with self._lock:
+            entry = self._entries.get(expiry)
+        return entry[1] if entry else None
+
+    def _refresh(self, expiry):
+        chain = None
+        try:
+            with self._lock:
+                self.fetches += 1
+            options = self.fetch_chain(expiry)
+            if options is not None:
+                chain = OptionChain(options)
+            with self._lock:
+                if chain is not None:
+                    self._entries[expiry] = (time.time(), chain)
+                else:
+                    self.fetch_errors += 1
+        except Exception as e:
+            print(f"Option chain fetch error for {expiry}: {e}")
+            with self._lock:
+                self.fetch_errors += 1
+        finally:
+            with self._lock:
+                event = self._inflight.pop(expiry, None)
+            if event:
+                event.set()
+        return chain
+
+    def invalidate(self, expiry=None):
+        with self._lock:
+            if expiry is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(expiry, None)
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+                'upstream_fetches': self.fetches,
+                'fetch_errors': self.fetch_errors,
+                'cached_expiries': list(self._entries.keys()),
+                'ttl': self.ttl,
+                'stale_ttl': self.stale_ttl
+            }
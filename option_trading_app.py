@@ -1,7 +1,7 @@
 # option_trading_app.py
 # COMPLETE UPDATED FILE WITH TELEGRAM POLLING
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 import json
 import os
 from datetime import datetime
@@ -9,11 +9,23 @@ import time
 import threading
 import requests  # ADDED FOR TELEGRAM API
 import uuid
-import sqlite3
 from crypto_optiontrading import DeltaOptionTrader
 from deltaprotraderweb import TradingBot, send_telegram_alert
+from http_transport import transport
+from option_chain import OptionChainCache
+from metrics import registry
+from trigger_engine import TriggerOrderEngine
+from trigger_store import TriggerOrderStore
+from trigger_execution import TriggerOrderExecutor
+from scheduler import DeadlineScheduler
+from db import get_database
+from migrations import migrate, compact_trigger_orders, ORDER_COLUMNS
+from trade_history import TradeHistoryStore
+from persistence import WriteBehindQueue
+import atexit
 from web_screener import screener_bp
 import subprocess  # Add this import at the top of the file
+from concurrent.futures import ThreadPoolExecutor
 
 # Load configuration
 def load_config():
@@ -47,81 +59,38 @@ TELEGRAM_BOT_TOKEN = '7956030237:AAHNzQejy0_q69NrVVGDr5erKmc5kbd2Apg'
 DEFAULT_CHAT_ID = '8008414806'
 
 # ============ SQLITE DATABASE SETUP ============
+# Bounded pool of persistent WAL connections (db.py) shared by request threads, instead of connect/close on every call
+db = get_database('trading_config.db')
+
 def init_db():
-    """Initialize SQLite database"""
+    """Initialize SQLite database - versioned migrations (migrations.py) apply करता है"""
     try:
-        conn = sqlite3.connect('trading_config.db')
-        cursor = conn.cursor()
-        
-        # Table for index exit levels
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS index_exit_levels (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                above_price REAL,
-                above_type TEXT,
-                below_price REAL,
-                below_type TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Table for pending trigger orders
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS pending_trigger_orders (
-                id TEXT PRIMARY KEY,
-                symbol TEXT NOT NULL,
-                product_id INTEGER NOT NULL,
-                side TEXT NOT NULL,
-                size INTEGER NOT NULL,
-                trigger_price REAL NOT NULL,
-                trigger_condition TEXT NOT NULL,
-                mark_price REAL,
-                total_cost REAL,
-                time_limit INTEGER,
-                expires_at REAL,
-                created_at TEXT,
-                status TEXT DEFAULT 'pending'
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        print("✅ Database initialized successfully")
+        version = migrate(db)
+        archived = compact_trigger_orders(db)
+        print(f"✅ Database initialized successfully (schema v{version}, archived {archived} finished orders)")
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
 
-def save_index_exit_levels(above_price, above_type, below_price, below_type):
-    """Save index exit levels to database"""
-    try:
-        conn = sqlite3.connect('trading_config.db')
-        cursor = conn.cursor()
-        
-        # Clear old entries
-        cursor.execute('DELETE FROM index_exit_levels')
-        
-        # Insert new entry
-        cursor.execute('''
-            INSERT INTO index_exit_levels (above_price, above_type, below_price, below_type)
-            VALUES (?, ?, ?, ?)
-        ''', (above_price, above_type, below_price, below_type))
-        
-        conn.commit()
-        conn.close()
-        print(f"💾 Saved index exit levels to DB: above={above_price}({above_type}), below={below_price}({below_type})")
-        return True
-    except Exception as e:
-        print(f"❌ Error saving to DB: {e}")
-        return False
+def write_index_exit_levels_batch(conn, level_updates):
+    """Write-behind writer: सिर्फ latest levels मायने रखते हैं, इसलिए batch का आखिरी update लिखा जाता है"""
+    levels = level_updates[-1]
+    cursor = conn.cursor()
+    
+    # Clear old entries
+    cursor.execute('DELETE FROM index_exit_levels')
+    
+    # Insert new entry
+    cursor.execute('''
+        INSERT INTO index_exit_levels (above_price, above_type, below_price, below_type)
+        VALUES (?, ?, ?, ?)
+    ''', (levels['above']['price'], levels['above']['type'], levels['below']['price'], levels['below']['type']))
+    
+    print(f"💾 Saved index exit levels to DB: above={levels['above']}, below={levels['below']}")
 
 def load_index_exit_levels():
     """Load index exit levels from database"""
     try:
-        conn = sqlite3.connect('trading_config.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT above_price, above_type, below_price, below_type FROM index_exit_levels ORDER BY id DESC LIMIT 1')
-        row = cursor.fetchone()
-        conn.close()
+        row = db.query_one('SELECT above_price, above_type, below_price, below_type FROM index_exit_levels ORDER BY id DESC LIMIT 1')
         
         if row:
             levels = {
@@ -140,106 +109,101 @@ def load_index_exit_levels():
 def save_pending_order_to_db(order_data):
     """Save pending trigger order to database"""
     try:
-        conn = sqlite3.connect('trading_config.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO pending_trigger_orders 
-            (id, symbol, product_id, side, size, trigger_price, trigger_condition, mark_price, total_cost, time_limit, expires_at, created_at, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            order_data['id'],
-            order_data['symbol'],
-            order_data['product_id'],
-            order_data['side'],
-            order_data['size'],
-            order_data['trigger_price'],
-            order_data['trigger_condition'],
-            order_data.get('mark_price', 0),
-            order_data.get('total_cost', 0),
-            order_data.get('time_limit'),
-            order_data.get('expires_at'),
-            order_data.get('created_at'),
-            order_data.get('status', 'pending')
-        ))
-        
-        conn.commit()
-        conn.close()
-        return True
+        with db.transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO pending_trigger_orders 
+                (id, symbol, product_id, side, size, trigger_price, trigger_condition, mark_price, total_cost, time_limit, expires_at, created_at, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                order_data['id'],
+                order_data['symbol'],
+                order_data['product_id'],
+                order_data['side'],
+                order_data['size'],
+                order_data['trigger_price'],
+                order_data['trigger_condition'],
+                order_data.get('mark_price', 0),
+                order_data.get('total_cost', 0),
+                order_data.get('time_limit'),
+                order_data.get('expires_at'),
+                order_data.get('created_at'),
+                order_data.get('status', 'pending')
+            ))
+            
+            return True
     except Exception as e:
         print(f"Error saving pending order to DB: {e}")
         return False
 
 def load_pending_orders_from_db():
-    """Load all pending trigger orders from database"""
+    """Load all pending trigger orders from database (status index, explicit columns)"""
     try:
-        conn = sqlite3.connect('trading_config.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM pending_trigger_orders WHERE status = 'pending'")
-        rows = cursor.fetchall()
-        
-        orders = []
-        for row in rows:
-            order = {
-                'id': row[0],
-                'symbol': row[1],
-                'product_id': row[2],
-                'side': row[3],
-                'size': row[4],
-                'trigger_price': row[5],
-                'trigger_condition': row[6],
-                'mark_price': row[7],
-                'total_cost': row[8],
-                'time_limit': row[9],
-                'expires_at': row[10],
-                'created_at': row[11],
-                'status': row[12]
-            }
-            orders.append(order)
-        
-        conn.close()
+        rows = db.query(
+            f"SELECT {', '.join(ORDER_COLUMNS)} FROM pending_trigger_orders WHERE status = 'pending'"
+        )
+        orders = [dict(zip(ORDER_COLUMNS, row)) for row in rows]
         print(f"📂 Loaded {len(orders)} pending orders from DB")
         return orders
     except Exception as e:
         print(f"Error loading pending orders from DB: {e}")
         return []
 
+def write_order_status_batch(conn, updates):
+    """Write-behind writer: (order_id, status, executed_at, exchange_order_id) updates"""
+    cursor = conn.cursor()
+    executed = [(status, executed_at, exchange_order_id, order_id)
+                for order_id, status, executed_at, exchange_order_id in updates if status == 'executed']
+    others = [(status, order_id) for order_id, status, _, _ in updates if status != 'executed']
+    if others:
+        cursor.executemany('''
+            UPDATE pending_trigger_orders 
+            SET status = ?
+            WHERE id = ?
+        ''', others)
+    if executed:
+        cursor.executemany('''
+            UPDATE pending_trigger_orders 
+            SET status = ?, executed_at = ?, order_id = ?
+            WHERE id = ?
+        ''', executed)
+
+def write_order_delete_batch(conn, order_ids):
+    """Write-behind writer: delete cancelled orders"""
+    conn.executemany('DELETE FROM pending_trigger_orders WHERE id = ?', [(order_id,) for order_id in order_ids])
+
 def update_order_status_in_db(order_id, status, order_id_executed=None):
-    """Update order status in database"""
+    """
+    Order status update - executed/failed तुरंत commit (restart पर fired order फिर pending न दिखे),
+    बाकी write-behind batch में
+    """
     try:
-        conn = sqlite3.connect('trading_config.db')
-        cursor = conn.cursor()
-        
-        if status == 'executed':
-            cursor.execute('''
-                UPDATE pending_trigger_orders 
-                SET status = ?, executed_at = ?, order_id = ?
-                WHERE id = ?
-            ''', (status, datetime.utcnow().isoformat(), order_id_executed, order_id))
+        executed_at = datetime.utcnow().isoformat() if status == 'executed' else None
+        payload = (order_id, status, executed_at, order_id_executed)
+        if status in ('executed', 'failed'):
+            persistence.write_now('order_status', payload)
         else:
-            cursor.execute('''
-                UPDATE pending_trigger_orders 
-                SET status = ?
-                WHERE id = ?
-            ''', (status, order_id))
-        
-        conn.commit()
-        conn.close()
+            persistence.submit('order_status', payload)
         return True
     except Exception as e:
         print(f"Error updating order status in DB: {e}")
         return False
 
+def update_orders_status_bulk_in_db(order_ids, status):
+    """Queue status updates for many orders - they land in the same write-behind transaction"""
+    try:
+        for order_id in order_ids:
+            persistence.submit('order_status', (order_id, status, None, None))
+        return True
+    except Exception as e:
+        print(f"Error bulk updating order status in DB: {e}")
+        return False
+
 def delete_order_from_db(order_id):
-    """Delete order from database"""
+    """Queue deletion of an order"""
     try:
-        conn = sqlite3.connect('trading_config.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM pending_trigger_orders WHERE id = ?', (order_id,))
-        conn.commit()
-        conn.close()
+        persistence.submit('order_delete', order_id)
         return True
     except Exception as e:
         print(f"Error deleting order from DB: {e}")
@@ -249,9 +213,19 @@ def delete_order_from_db(order_id):
 init_db()
 
 # Initialize components
-trading_bot = TradingBot()
+trading_bot = TradingBot(
+    poll_min_interval=(config or {}).get('price_poll_min_interval', 0.5),
+    poll_max_interval=(config or {}).get('price_poll_max_interval', 5.0)
+)
 option_trader = DeltaOptionTrader(api_key=api_key, api_secret=api_secret)
 
+# Option chain cache (TTL + stale-while-revalidate, single-flight per expiry)
+chain_cache = OptionChainCache(
+    registry.timed('option_trader get_options_chain', option_trader.get_options_chain),
+    ttl=(config or {}).get('option_chain_ttl', 5),
+    stale_ttl=(config or {}).get('option_chain_stale_ttl', 60)
+)
+
 # Load saved index exit levels from database
 saved_levels = load_index_exit_levels()
 
@@ -268,11 +242,34 @@ else:
     }
     print("ℹ️ No saved levels found, using defaults")
 
-# Load pending trigger orders from database
-app.pending_trigger_orders = load_pending_orders_from_db()
+# Load pending trigger orders from database into the indexed, lock-protected store
+app.trigger_orders = TriggerOrderStore()
+for pending_order in load_pending_orders_from_db():
+    try:
+        app.trigger_orders.add(pending_order)
+    except (ValueError, TypeError) as e:
+        print(f"Skipping invalid trigger order {pending_order.get('id')}: {e}")
 
-# Trade history storage
+# Trade history storage (append-only SQLite; old trade_history.json is imported once)
 TRADE_HISTORY_FILE = "trade_history.json"
+trade_history = TradeHistoryStore(db, legacy_file=TRADE_HISTORY_FILE)
+
+# Single write-behind worker for trade inserts and order status changes (flushed on exit)
+persistence = WriteBehindQueue(
+    db,
+    batch_size=(config or {}).get('persistence_batch_size', 200),
+    flush_interval=(config or {}).get('persistence_flush_interval', 0.25)
+)
+persistence.register('trade', TradeHistoryStore.write_batch)
+persistence.register('order_status', write_order_status_batch)
+persistence.register('order_delete', write_order_delete_batch)
+persistence.register('index_exit_levels', write_index_exit_levels_batch)
+persistence.start()
+atexit.register(persistence.stop)
+
+# Exit levels: memory authoritative है, हर change (routes या bot का auto-clear) SQLite में अभी commit होता है
+# (queue से नहीं - dropped write से restart पर पुराना level न लौटे); fail हो तो store अगले set पर फिर लिखता है
+trading_bot.exit_levels.set_persister(lambda version, levels: persistence.write_now('index_exit_levels', levels))
 
 # Helper function for expiry dates
 def generate_expiry_dates():
@@ -303,7 +300,7 @@ def send_telegram_response(chat_id, text):
         "parse_mode": "HTML"
     }
     try:
-        response = requests.post(url, json=payload, timeout=5)
+        response = transport.post(url, json=payload)
         if response.status_code == 200:
             return True
         else:
@@ -331,7 +328,7 @@ def telegram_polling():
                 'allowed_updates': ['message']
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            response = transport.get(url, params=params, timeout=(3.05, 30))
             
             if response.status_code == 200:
                 data = response.json()
@@ -638,6 +635,14 @@ timeout /t 5 /nobreak >nul
                                     last_trade_sign = '+' if last_trade_realized_pnl >= 0 else ''
                                     response_text += f"<b>Realized PNL (Last Trade):</b> {last_trade_sign}{last_trade_realized_pnl:.2f} USD\n"
                                     
+                                    # Add Today / 30-day Realized PNL from local ledger
+                                    today_realized_pnl = pnl_info.get('today_realized_pnl', 0.0)
+                                    realized_pnl_30d = pnl_info.get('realized_pnl_30d', 0.0)
+                                    today_sign = '+' if today_realized_pnl >= 0 else ''
+                                    month_sign = '+' if realized_pnl_30d >= 0 else ''
+                                    response_text += f"<b>Realized PNL (Today):</b> {today_sign}{today_realized_pnl:.2f} USD\n"
+                                    response_text += f"<b>Realized PNL (30 Days):</b> {month_sign}{realized_pnl_30d:.2f} USD\n"
+                                    
                                     # Add Unrealized PNL only if there are active positions
                                     if active_positions > 0:
                                         unrealized_sign = '+' if total_unrealized_pnl >= 0 else ''
@@ -789,18 +794,8 @@ print("✅ Periodic BTC updates thread started (every 30 minutes)")
 # ============ TRADE HISTORY FUNCTIONS ============
 
 def save_trade_to_history(trade_data):
-    """Save trade to history JSON file"""
+    """Queue trade for the append-only trade history table (non-blocking)"""
     try:
-        trades = []
-        
-        # Load existing trades if file exists
-        if os.path.exists(TRADE_HISTORY_FILE):
-            try:
-                with open(TRADE_HISTORY_FILE, 'r') as f:
-                    trades = json.load(f)
-            except:
-                trades = []
-        
         # Add timestamp if not present
         if 'timestamp' not in trade_data:
             trade_data['timestamp'] = datetime.now().isoformat()
@@ -810,16 +805,7 @@ def save_trade_to_history(trade_data):
         if 'id' not in trade_data:
             trade_data['id'] = str(uuid.uuid4())
         
-        # Add trade to beginning of list (newest first)
-        trades.insert(0, trade_data)
-        
-        # Keep only last 100 trades
-        if len(trades) > 100:
-            trades = trades[:100]
-        
-        # Save back to file
-        with open(TRADE_HISTORY_FILE, 'w') as f:
-            json.dump(trades, f, indent=2)
+        persistence.submit('trade', trade_data)
         
         print(f"Trade saved to history: {trade_data['symbol']}")
         return True
@@ -827,17 +813,24 @@ def save_trade_to_history(trade_data):
         print(f"Error saving trade history: {e}")
         return False
 
-def load_trade_history(count=100):
-    """Load trade history from JSON file"""
+def load_trade_history(count=100, before=None, symbol=None, order_type=None, since=None):
+    """Load a newest-first page of trade history - (trades, next_cursor)"""
     try:
-        if os.path.exists(TRADE_HISTORY_FILE):
-            with open(TRADE_HISTORY_FILE, 'r') as f:
-                trades = json.load(f)
-            return trades[:count]
-        return []
+        return trade_history.page(count, before=before, symbol=symbol, order_type=order_type, since=since)
     except Exception as e:
         print(f"Error loading trade history: {e}")
-        return []
+        return [], None
+
+def trade_page_args(default_limit, max_limit):
+    """Query string से pagination/filter arguments"""
+    limit = min(max(request.args.get('limit', default_limit, type=int), 1), max_limit)
+    return {
+        'count': limit,
+        'before': request.args.get('cursor', type=int),
+        'symbol': request.args.get('symbol'),
+        'order_type': request.args.get('order_type'),
+        'since': request.args.get('since')
+    }
 
 # ============ FLASK ROUTES ============
 
@@ -868,6 +861,8 @@ def get_state():
         'ip_verified': trading_bot.ip_verified,
         'position': trading_bot.position,
         'active_orders': trading_bot.active_orders,
+        'price_feed': trading_bot.price_stream.get_status(),
+        'price_poll': trading_bot.poll_cadence.get_status(),
     })
 
 def process_single_option(option_data):
@@ -892,6 +887,14 @@ def process_single_option(option_data):
     
     return option_data
 
+def resolve_contract(symbol):
+    """Symbol (C/P-BTC-Strike-Expiry) से cached indexed chain में contract ढूंढता है"""
+    parts = symbol.split('-') if symbol else []
+    if len(parts) != 4:
+        return None
+    chain = chain_cache.get(parts[3])
+    return chain.get(symbol) if chain else None
+
 @app.route('/get_options_chain', methods=['POST'])
 def get_options_chain():
     try:
@@ -910,16 +913,12 @@ def get_options_chain():
             expiry_date_str = parts[3]  # Last part is expiry date (ddmmyy)
             
             # Fetch all options for this expiry
-            all_options = option_trader.get_options_chain(expiry_date_str)
+            all_options = chain_cache.get(expiry_date_str)
             if all_options is None:
                 return jsonify({'success': False, 'error': 'Failed to fetch options from API.'})
             
             # Find the specific option
-            target_option = None
-            for opt in all_options:
-                if opt.get('symbol') == manual_symbol:
-                    target_option = opt
-                    break
+            target_option = all_options.get(manual_symbol)
             
             if not target_option:
                 return jsonify({'success': False, 'error': f'Option {manual_symbol} not found'})
@@ -939,92 +938,45 @@ def get_options_chain():
             return jsonify({'success': False, 'error': 'Expiry date is missing'})
 
         expiry_date_str = datetime.strptime(expiry_date, "%m/%d/%y").strftime("%d%m%y")
-        all_options = option_trader.get_options_chain(expiry_date_str)
+        all_options = chain_cache.get(expiry_date_str)
 
         if all_options is None:
             return jsonify({'success': False, 'error': 'Failed to fetch options from API. Check server logs.'})
         if not all_options:
             return jsonify({'success': False, 'error': 'No options found for the selected expiry date.'})
 
-        processed_options = []
-        for opt in all_options:
-            if 'mark_price' in opt and isinstance(opt['mark_price'], str):
-                try: opt['mark_price'] = float(opt['mark_price'])
-                except ValueError: opt['mark_price'] = None
-            if 'greeks' in opt and isinstance(opt['greeks'], dict):
-                for key in ['delta', 'gamma', 'rho', 'theta', 'vega']:
-                    if key in opt['greeks'] and isinstance(opt['greeks'][key], str):
-                        try: opt['greeks'][key] = float(opt['greeks'][key])
-                        except ValueError: opt['greeks'][key] = None
-            processed_options.append(opt)
-        
-        # Rest of the original auto-find logic remains SAME
+        # Chain is parsed once into NumPy columns on refresh; selection is vectorized
         if option_type_filter == 'Calls':
-            delta_min, delta_max = 0.44, 0.58
-            eligible = [o for o in processed_options 
-                       if o['contract_type'] == 'call_options' 
-                       and o.get('greeks', {}).get('delta') 
-                       and delta_min <= abs(o['greeks']['delta']) <= delta_max]
-            if eligible: 
-                selected_option = max(eligible, key=lambda x: x['greeks']['delta'])
+            selected_option = all_options.select_max_delta('call')
+            if selected_option:
                 return jsonify({'success': True, 'options': [selected_option], 'filtered_count': 1, 'expiry_date': expiry_date})
             else:
                 return jsonify({'success': False, 'error': f'No suitable Calls option found in delta range for {expiry_date}.'})
         
         elif option_type_filter == 'Puts':
-            delta_min, delta_max = 0.44, 0.58
-            eligible = [o for o in processed_options 
-                       if o['contract_type'] == 'put_options' 
-                       and o.get('greeks', {}).get('delta') 
-                       and delta_min <= abs(o['greeks']['delta']) <= delta_max]
-            if eligible: 
-                selected_option = max(eligible, key=lambda x: abs(x['greeks']['delta']))
+            selected_option = all_options.select_max_delta('put')
+            if selected_option:
                 return jsonify({'success': True, 'options': [selected_option], 'filtered_count': 1, 'expiry_date': expiry_date})
             else:
                 return jsonify({'success': False, 'error': f'No suitable Puts option found in delta range for {expiry_date}.'})
 
         elif option_type_filter == 'Straddle':
-            delta_min, delta_max = 0.44, 0.58
-            
-            eligible_calls = [o for o in processed_options 
-                            if o['contract_type'] == 'call_options' 
-                            and o.get('greeks', {}).get('delta') 
-                            and delta_min <= abs(o['greeks']['delta']) <= delta_max]
-            
-            eligible_puts = [o for o in processed_options 
-                           if o['contract_type'] == 'put_options' 
-                           and o.get('greeks', {}).get('delta') 
-                           and delta_min <= abs(o['greeks']['delta']) <= delta_max]
-            
-            strike_map = {}
-            for opt in eligible_calls + eligible_puts:
-                strike = float(opt['symbol'].split('-')[2])
-                if strike not in strike_map:
-                    strike_map[strike] = {'call': None, 'put': None}
-                
-                if opt['contract_type'] == 'call_options':
-                    strike_map[strike]['call'] = opt
-                else:
-                    strike_map[strike]['put'] = opt
-            
-            straddles = []
-            for strike, pair in strike_map.items():
-                if pair['call'] and pair['put']:
-                    straddles.append({
-                        'strike': strike,
-                        'call': pair['call'],
-                        'put': pair['put']
-                    })
+            straddles = all_options.straddle_pairs()
             
             if straddles:
                 options = []
-                for straddle in straddles:
-                    options.append(straddle['call'])
-                    options.append(straddle['put'])
+                for strike, call, put in straddles:
+                    options.append(call)
+                    options.append(put)
                 
                 return jsonify({'success': True, 'options': options, 'filtered_count': len(straddles), 'expiry_date': expiry_date, 'is_straddle': True})
             else:
-                return jsonify({'success': False, 'error': f'No suitable Straddle option found in delta range for {expiry_date}.', 'available_calls': len(eligible_calls) > 0, 'available_puts': len(eligible_puts) > 0})
+                return jsonify({
+                    'success': False,
+                    'error': f'No suitable Straddle option found in delta range for {expiry_date}.',
+                    'available_calls': bool(all_options.delta_band_mask('call').any()),
+                    'available_puts': bool(all_options.delta_band_mask('put').any())
+                })
 
     except Exception as e:
         print(f"Error in /get_options_chain: {e}")
@@ -1034,12 +986,13 @@ def get_options_chain():
 def place_option_order():
     try:
         data = request.get_json()
-        result = option_trader.place_order(
-            symbol=data['symbol'], 
-            product_id=data['product_id'], 
-            side=data['side'], 
-            size=data['size']
-        )
+        with registry.timer('option_trader place_order'):
+            result = option_trader.place_order(
+                symbol=data['symbol'], 
+                product_id=data['product_id'], 
+                side=data['side'], 
+                size=data['size']
+            )
         
         if 'error' in result:
             return jsonify({'success': False, 'error': result['error']})
@@ -1066,11 +1019,8 @@ def place_option_order():
             'is_straddle': data.get('is_straddle', False)
         }
         
-        # Save in background thread
-        threading.Thread(
-            target=lambda: save_trade_to_history(trade_data),
-            daemon=True
-        ).start()
+        # Queued on the write-behind worker
+        save_trade_to_history(trade_data)
         
         return jsonify({'success': True, 'order_id': result.get('result', {}).get('id', 'N/A')})
     except Exception as e:
@@ -1092,15 +1042,11 @@ def fetch_greeks():
             
         expiry_date = parts[3]
         
-        options_chain = option_trader.get_options_chain(expiry_date)
+        options_chain = chain_cache.get(expiry_date)
         if not options_chain:
             return jsonify({'success': False, 'error': 'No options found for this expiry'})
         
-        option_details = None
-        for opt in options_chain:
-            if opt.get('symbol') == option_symbol:
-                option_details = opt
-                break
+        option_details = options_chain.get(option_symbol)
                 
         if not option_details:
             return jsonify({'success': False, 'error': 'Option not found'})
@@ -1142,13 +1088,8 @@ def update_index_exit():
     try:
         data = request.get_json()
         
-        # FIRST: Load existing levels from database
-        existing_levels = load_index_exit_levels()
-        if not existing_levels:
-            existing_levels = {
-                'above': {'price': None, 'type': None},
-                'below': {'price': None, 'type': None}
-            }
+        # Existing levels from the in-memory store (no DB read)
+        existing_levels = app.trading_bot.index_exit_params
         
         # Get current values
         current_above_price = existing_levels['above']['price']
@@ -1194,43 +1135,70 @@ def update_index_exit():
             # Keep existing type
             new_below_type = current_below_type
         
-        # Now set the updated levels
-        app.trading_bot.set_index_exit_params(
+        # Now set the updated levels (store DB में write-through करता है)
+        result = app.trading_bot.set_index_exit_params(
             above_price=new_above, 
             below_price=new_below, 
             above_type=new_above_type, 
             below_type=new_below_type
         )
         
-        # Save to database
-        save_index_exit_levels(new_above, new_above_type, new_below, new_below_type)
-        
-        print(f"✅ UPDATE_EXIT: Levels set and saved to DB: {app.trading_bot.index_exit_params}")
-        return jsonify({'success': True, 'levels': app.trading_bot.index_exit_params})
+        version, levels = app.trading_bot.exit_levels.snapshot()
+        if not result.get('success'):
+            print(f"❌ UPDATE_EXIT: {result.get('error')}")
+            return jsonify({'success': False, 'error': result.get('error'), 'levels': levels, 'version': version})
+        print(f"✅ UPDATE_EXIT: Levels set (v{version}): {levels}")
+        return jsonify({'success': True, 'levels': levels, 'version': version})
     except Exception as e:
         print(f"❌ Error in update_index_exit: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/get_index_exit_params', methods=['GET'])
 def get_index_exit_params():
-    levels = app.trading_bot.index_exit_params
-    print(f"📊 GET_EXIT: Returning levels: {levels}")
-    return jsonify({'success': True, 'levels': levels})
+    """In-memory levels; ETag = store version, इसलिए unchanged polls को 304 मिलता है"""
+    store = app.trading_bot.exit_levels
+    version, levels = store.snapshot()
+    etag = f"{store.epoch}-{version}"
+    if etag in request.if_none_match:
+        return Response(status=304, headers={'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'})
+    response = jsonify({'success': True, 'levels': levels, 'version': version})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/clear_exit_levels', methods=['POST'])
 def clear_exit_levels():
     print(f"🔄 CLEAR_LEVELS: BEFORE clearing: {app.trading_bot.index_exit_params}")
-    app.trading_bot.set_index_exit_params(None, None, None, None)
+    result = app.trading_bot.set_index_exit_params(None, None, None, None)
     print(f"🔄 CLEAR_LEVELS: AFTER clearing: {app.trading_bot.index_exit_params}")
     
-    # Clear from database
-    save_index_exit_levels(None, None, None, None)
-    
-    return jsonify({'success': True, 'levels': app.trading_bot.index_exit_params})
+    # DB clear store के write-through से होता है
+    version, levels = app.trading_bot.exit_levels.snapshot()
+    if not result.get('success'):
+        return jsonify({'success': False, 'error': result.get('error'), 'levels': levels, 'version': version})
+    return jsonify({'success': True, 'levels': levels, 'version': version})
 
 @app.route('/get_pending_trigger_orders', methods=['GET'])
 def get_pending_trigger_orders():
-    return jsonify({'success': True, 'orders': app.pending_trigger_orders})
+    return jsonify({'success': True, 'orders': app.trigger_orders.snapshot()})
+
+@app.route('/get_trigger_engine_stats', methods=['GET'])
+def get_trigger_engine_stats():
+    return jsonify({
+        'success': True,
+        'stats': trigger_engine.get_stats(),
+        'recent_executions': list(execute_trigger_order.timings)
+    })
+
+@app.route('/get_persistence_stats', methods=['GET'])
+def get_persistence_stats():
+    """Write-behind queue: depth, batches और flush latency"""
+    return jsonify({'success': True, 'stats': persistence.get_stats()})
+
+@app.route('/get_price_event_stats', methods=['GET'])
+def get_price_event_stats():
+    """Price dispatcher: published ticks और हर subscriber की queue depth / drops / lag"""
+    return jsonify({'success': True, 'stats': trading_bot.price_events.get_stats()})
 
 @app.route('/add_trigger_order', methods=['POST'])
 def add_trigger_order():
@@ -1240,6 +1208,13 @@ def add_trigger_order():
         
         if not all(field in data for field in required_fields):
             return jsonify({'success': False, 'error': 'Missing required fields'})
+        
+        # Resolve placeholder product_id (0) through the indexed chain
+        if not data.get('product_id'):
+            contract = resolve_contract(data['symbol'])
+            if not contract or not contract.get('product_id'):
+                return jsonify({'success': False, 'error': f"Could not resolve product_id for {data['symbol']}"})
+            data['product_id'] = contract['product_id']
             
         trigger_order = {
             **data,
@@ -1258,11 +1233,20 @@ def add_trigger_order():
         else:
             trigger_order['expires_at'] = None
         
-        # Save to database
-        save_pending_order_to_db(trigger_order)
+        # Persist first: a fired order's status update must always find its row
+        if not save_pending_order_to_db(trigger_order):
+            return jsonify({'success': False, 'error': 'Could not save trigger order'})
         
-        # Add to in-memory list
-        app.pending_trigger_orders.append(trigger_order)
+        # Then arm it in the store (validates trigger_price/trigger_condition)
+        try:
+            app.trigger_orders.add(trigger_order)
+        except (ValueError, TypeError):
+            delete_order_from_db(trigger_order['id'])
+            raise
+        
+        # Arm expiry timer
+        if trigger_order['expires_at']:
+            expiry_scheduler.schedule(trigger_order['id'], trigger_order['expires_at'])
         
         message = (
             f"⚠️ *New Trigger Order Added*\n\n"
@@ -1290,25 +1274,28 @@ def cancel_trigger_order():
         data = request.get_json()
         order_id = data.get('order_id')
         
-        for idx, order in enumerate(app.pending_trigger_orders):
-            if order.get('id') == order_id:
-                cancelled_order = app.pending_trigger_orders.pop(idx)
-                
-                # Delete from database
-                delete_order_from_db(order_id)
-                
-                message = (
-                    f"❌ *Trigger Order Cancelled*\n\n"
-                    f"*Symbol:* {cancelled_order['symbol']}\n"
-                    f"*Action:* {cancelled_order['side'].upper()}\n"
-                    f"*Quantity:* {cancelled_order['size']}\n"
-                    f"*Trigger:* {cancelled_order['trigger_condition']} {cancelled_order['trigger_price']}\n"
-                )
-                trading_bot.send_telegram_notification(message)
-                
-                return jsonify({'success': True, 'message': 'Order cancelled'})
-                
-        return jsonify({'success': False, 'error': 'Order not found'})
+        # Atomic: सिर्फ pending order cancel होता है (firing/expired order नहीं)
+        cancelled_order = app.trigger_orders.transition(order_id, 'cancelled')
+        if cancelled_order is None:
+            if order_id in app.trigger_orders:
+                return jsonify({'success': False, 'error': 'Order is already executing'})
+            return jsonify({'success': False, 'error': 'Order not found'})
+        
+        expiry_scheduler.cancel(order_id)
+        
+        # Delete from database
+        delete_order_from_db(order_id)
+        
+        message = (
+            f"❌ *Trigger Order Cancelled*\n\n"
+            f"*Symbol:* {cancelled_order['symbol']}\n"
+            f"*Action:* {cancelled_order['side'].upper()}\n"
+            f"*Quantity:* {cancelled_order['size']}\n"
+            f"*Trigger:* {cancelled_order['trigger_condition']} {cancelled_order['trigger_price']}\n"
+        )
+        trading_bot.send_telegram_notification(message)
+        
+        return jsonify({'success': True, 'message': 'Order cancelled'})
         
     except Exception as e:
         print(f"Error in /cancel_trigger_order: {e}")
@@ -1347,10 +1334,7 @@ def log_exit_event():
         }
         
         # Save to history
-        threading.Thread(
-            target=lambda: save_trade_to_history(exit_trade),
-            daemon=True
-        ).start()
+        save_trade_to_history(exit_trade)
         
         # Also log to bot logs
         app.trading_bot.log_message(f"Exit logged: {data.get('message', 'Index exit')}")
@@ -1366,8 +1350,8 @@ def log_exit_event():
 def get_recent_trades():
     """Get recent trades for display"""
     try:
-        trades = load_trade_history(3)  # Last 3 trades
-        return jsonify({'success': True, 'trades': trades})
+        trades, next_cursor = load_trade_history(**trade_page_args(3, 100))  # Last 3 trades by default
+        return jsonify({'success': True, 'trades': trades, 'next_cursor': next_cursor})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -1375,8 +1359,8 @@ def get_recent_trades():
 def get_all_trades():
     """Get all trades for archive view"""
     try:
-        trades = load_trade_history(100)
-        return jsonify({'success': True, 'trades': trades})
+        trades, next_cursor = load_trade_history(**trade_page_args(500, 1000))
+        return jsonify({'success': True, 'trades': trades, 'next_cursor': next_cursor})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -1384,8 +1368,7 @@ def get_all_trades():
 def clear_trade_history():
     """Clear all trade history"""
     try:
-        if os.path.exists(TRADE_HISTORY_FILE):
-            os.remove(TRADE_HISTORY_FILE)
+        trade_history.clear()
         return jsonify({'success': True, 'message': 'Trade history cleared'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -1410,13 +1393,36 @@ def send_trade_update():
         print(f"Error in /send_trade_update: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Outbound call latency/error metrics in Prometheus text format"""
+    return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/get_latency_summary', methods=['GET'])
+def get_latency_summary():
+    """Per-endpoint p50/p95/p99, errors and timeouts as JSON"""
+    return jsonify({'success': True, 'endpoints': registry.snapshot()})
+
+@app.route('/get_chain_cache_stats', methods=['GET'])
+def get_chain_cache_stats():
+    """Option chain cache hit/miss counters"""
+    return jsonify({'success': True, 'stats': chain_cache.get_stats()})
+
+@app.route('/get_transport_stats', methods=['GET'])
+def get_transport_stats():
+    """HTTP connection pool reuse statistics"""
+    try:
+        return jsonify({'success': True, 'stats': transport.get_stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/test_telegram', methods=['GET'])
 def test_telegram():
     """Test endpoint to check Telegram connection"""
     try:
         # Test connection to Telegram API
         url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getMe"
-        response = requests.get(url, timeout=5)
+        response = transport.get(url)
         
         if response.status_code == 200:
             bot_info = response.json()
@@ -1436,121 +1442,88 @@ def test_telegram():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-# ============ TRIGGER ORDER MONITOR THREAD ============
+# ============ TRIGGER ORDER ENGINE ============
+
+# Crossed trigger orders इस bounded pool पर concurrently place होते हैं
+trigger_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='trigger')
+
+def expire_trigger_orders(due):
+    """
+    Expiry scheduler callback - सभी due orders एक batch में expire करता है
+    और SQLite में एक ही transaction में status update करता है।
+    """
+    expired = []
+    for order_id, _ in due:
+        # Atomic: इसी बीच fire/cancel हुआ order expire नहीं होता
+        order = app.trigger_orders.transition(order_id, 'expired')
+        if order is None:
+            continue
+        order['error'] = 'Time limit expired'
+        expired.append(order)
+    
+    if not expired:
+        return
+    
+    # Update database
+    update_orders_status_bulk_in_db([o['id'] for o in expired], 'expired')
+    
+    for order in expired:
+        message = (
+            f"⏰ *Trigger Order Expired*\n"
+            f"Symbol: {order['symbol']}\n"
+            f"Action: {order['side'].upper()}\n"
+            f"Quantity: {order['size']}\n"
+            f"Trigger: {order['trigger_condition']} {order['trigger_price']}\n"
+            f"Time Limit: {order.get('time_limit', 'N/A')} minutes\n"
+            f"Reason: Time limit exceeded"
+        )
+        trading_bot.send_telegram_notification(message)
+
+# Expiry scheduler: wakes exactly at the next trigger-order deadline
+expiry_scheduler = DeadlineScheduler(expire_trigger_orders, name='trigger-expiry')
+for pending_order in app.trigger_orders.pending():
+    if pending_order.get('expires_at'):
+        expiry_scheduler.schedule(pending_order['id'], pending_order['expires_at'])
+
+# Trigger engine: every BTC tick is evaluated against the sorted trigger index
+def notify_in_background(message):
+    threading.Thread(target=trading_bot.send_telegram_notification, args=(message,), daemon=True).start()
+
+# Crossed order placement (same code path the replay harness runs)
+execute_trigger_order = TriggerOrderExecutor(
+    app.trigger_orders, trading_bot.api,
+    expiry=expiry_scheduler,
+    update_status=update_order_status_in_db,
+    save_trade=save_trade_to_history,
+    notify=notify_in_background,
+    timer=registry.timer
+)
+
+trigger_engine = TriggerOrderEngine(app.trigger_orders, execute_trigger_order,
+                                   log=trading_bot.log_message, executor=trigger_executor)
+trading_bot.price_events.subscribe('trigger_orders', trigger_engine.on_tick)
+trading_bot.add_level_source(app.trigger_orders.nearest)
+print(f"✅ Trigger engine started with {len(app.trigger_orders.index)} resting orders")
+expiry_scheduler.start()
+print(f"✅ Expiry scheduler started with {len(expiry_scheduler)} timers")
+
+# Periodic compaction: finished trigger orders move to pending_trigger_orders_archive
+TRIGGER_ARCHIVE_INTERVAL = (config or {}).get('trigger_archive_interval', 3600)
+
+def run_trigger_archive(due):
+    """Write-behind queue flush होने के बाद non-pending orders archive करता है, फिर खुद को reschedule"""
+    try:
+        persistence.flush()
+        archived = compact_trigger_orders(db)
+        if archived:
+            print(f"🗄️ Archived {archived} finished trigger orders")
+    except Exception as e:
+        print(f"Error archiving trigger orders: {e}")
+    maintenance_scheduler.schedule('trigger_archive', time.time() + TRIGGER_ARCHIVE_INTERVAL)
 
-def trigger_order_monitor():
-    """Monitor and execute pending trigger orders with time limits"""
-    import time as t
-    while True:
-        try:
-            current_price = trading_bot.live_price
-            current_time = t.time()
-            
-            if current_price and app.pending_trigger_orders:
-                for order in app.pending_trigger_orders[:]:
-                    if order['status'] == 'pending':
-                        # Check if order has expired
-                        if order.get('expires_at') and current_time > order['expires_at']:
-                            order['status'] = 'expired'
-                            order['error'] = 'Time limit expired'
-                            
-                            # Update database
-                            update_order_status_in_db(order['id'], 'expired')
-                            
-                            message = (
-                                f"⏰ *Trigger Order Expired*\n"
-                                f"Symbol: {order['symbol']}\n"
-                                f"Action: {order['side'].upper()}\n"
-                                f"Quantity: {order['size']}\n"
-                                f"Trigger: {order['trigger_condition']} {order['trigger_price']}\n"
-                                f"Time Limit: {order.get('time_limit', 'N/A')} minutes\n"
-                                f"Reason: Time limit exceeded"
-                            )
-                            trading_bot.send_telegram_notification(message)
-                            continue
-                        
-                        trigger_met = False
-                        trigger_price = float(order['trigger_price'])
-                        
-                        if order['trigger_condition'] == 'above' and current_price >= trigger_price:
-                            trigger_met = True
-                        elif order['trigger_condition'] == 'below' and current_price <= trigger_price:
-                            trigger_met = True
-                        
-                        if trigger_met:
-                            try:
-                                result = option_trader.place_order(
-                                    symbol=order['symbol'],
-                                    product_id=order['product_id'],
-                                    side=order['side'],
-                                    size=order['size']
-                                )
-                                
-                                if 'error' in result:
-                                    order['status'] = 'failed'
-                                    order['error'] = result['error']
-                                    update_order_status_in_db(order['id'], 'failed')
-                                else:
-                                    order['status'] = 'executed'
-                                    order['executed_at'] = datetime.utcnow().isoformat()
-                                    order['order_id'] = result.get('result', {}).get('id', 'N/A')
-                                    
-                                    # Update database
-                                    update_order_status_in_db(order['id'], 'executed', order['order_id'])
-                                    
-                                    # Extract strike price
-                                    strike_price = None
-                                    if '-' in order['symbol']:
-                                        parts = order['symbol'].split('-')
-                                        if len(parts) >= 3:
-                                            strike_price = parts[2]
-                                    
-                                    # Save trade to history
-                                    trade_data = {
-                                        'symbol': order['symbol'],
-                                        'product_id': order['product_id'],
-                                        'side': order['side'],
-                                        'size': order['size'],
-                                        'price': order.get('mark_price', 0),
-                                        'strike_price': strike_price,
-                                        'total_cost': order.get('total_cost', 0),
-                                        'order_id': order['order_id'],
-                                        'order_type': 'trigger',
-                                        'status': 'executed',
-                                        'trigger_price': order['trigger_price'],
-                                        'trigger_condition': order['trigger_condition']
-                                    }
-                                    
-                                    threading.Thread(
-                                        target=lambda: save_trade_to_history(trade_data),
-                                        daemon=True
-                                    ).start()
-                                    
-                                    message = (
-                                        f"✅ Trigger Order Executed\n"
-                                        f"Symbol: {order['symbol']}\n"
-                                        f"Action: {order['side'].upper()}\n"
-                                        f"Quantity: {order['size']}\n"
-                                        f"Trigger: {order['trigger_condition']} {order['trigger_price']}\n"
-                                        f"Executed At: {current_price}"
-                                    )
-                                    trading_bot.send_telegram_notification(message)
-                                
-                            except Exception as e:
-                                order['status'] = 'failed'
-                                order['error'] = str(e)
-                                update_order_status_in_db(order['id'], 'failed')
-            
-            # Clean up executed/failed/expired orders from memory
-            app.pending_trigger_orders = [
-                o for o in app.pending_trigger_orders 
-                if o.get('status') == 'pending'
-            ]
-            
-            t.sleep(5)
-        except Exception as e:
-            print(f"Trigger monitor error: {e}")
-            t.sleep(10)
+maintenance_scheduler = DeadlineScheduler(run_trigger_archive, name='db-maintenance')
+maintenance_scheduler.schedule('trigger_archive', time.time() + TRIGGER_ARCHIVE_INTERVAL)
+maintenance_scheduler.start()
 
 @app.route('/get_exit_countdown_status', methods=['GET'])
 def get_exit_countdown_status():
@@ -1577,6 +1550,14 @@ def get_exit_countdown_status():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/get_exit_latency', methods=['GET'])
+def get_exit_latency():
+    """Trigger-to-flat latency of recent exits"""
+    try:
+        return jsonify({'success': True, 'stats': app.trading_bot.get_exit_latency_stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/cancel_exit_countdown', methods=['POST'])
 def cancel_exit_countdown():
     """Cancel pending exit countdown from webpage"""
@@ -1595,10 +1576,6 @@ def cancel_exit_countdown():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-# Start monitor thread
-monitor_thread = threading.Thread(target=trigger_order_monitor, daemon=True)
-monitor_thread.start()
-print("✅ Trigger order monitor thread started")
 
 # ============ MAIN ENTRY POINT ============
 
@@ -0,0 +1,227 @@
+# persistence.py
+# Single write-behind worker: batches SQLite writes from all threads into a few transactions
+import queue
+import threading
+import time
+from collections import deque
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Callers submit(kind, payload) करते हैं और तुरंत लौट आते हैं; एक worker thread queue
+    से items batch में उठाकर एक transaction में लिखता है।
+    - Flush तब होता है जब batch_size items जमा हों या पहले item को flush_interval हो जाए
+    - Queue bounded है: भरने पर put_timeout तक wait, फिर caller के thread में synchronous write
+    - एक batch में items FIFO क्रम में लिखे जाते हैं (same kind के लगातार items एक executemany में)
+    - Batch fail होने पर एक retry, फिर हर kind अलग transaction में, फिर हर item अलग - एक bad row
+      सिर्फ खुद खोती है (dropped में गिनी जाती है)
+    - write_now() queue bypass करके caller के thread में लिखता है (जैसे terminal order status)
+    - flush() तब लौटता है जब submit हुआ हर item commit (या drop) हो चुका हो
+    - stop() बची हुई queue flush करके लौटता है (shutdown पर call करें)
+    """
+
+    def __init__(self, db, maxsize=10000, batch_size=200, flush_interval=0.25, put_timeout=0.5, log=print):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.log = log
+        self._writers = {}
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._idle = threading.Condition(self._stats_lock)
+        self._in_flight = 0   # submitted पर अभी commit/drop नहीं हुए (queue + worker का current batch)
+        self._flush_times = deque(maxlen=256)
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.retries = 0
+        self.dropped = 0
+        self.sync_writes = 0
+        self.max_depth = 0
+
+    def register(self, kind, writer):
+        """writer(conn, payloads) - एक ही kind के payloads को दिए गए connection पर लिखता है"""
+        self._writers[kind] = writer
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def submit(self, kind, payload):
+        if kind not in self._writers:
+            raise ValueError(f"No writer registered for {kind}")
+        with self._stats_lock:
+            self.submitted += 1
+            self._in_flight += 1
+        if self._thread is None or not self._thread.is_alive():
+            # Worker नहीं चल रहा (start से पहले / stop के बाद) - queue में पड़ा item कभी नहीं लिखा जाता
+            with self._stats_lock:
+                self.sync_writes += 1
+            self._write([(kind, payload)])
+            return
+        try:
+            self._queue.put((kind, payload), timeout=self.put_timeout)
+        except queue.Full:
+            # Backpressure: worker पीछे है - data खोने की जगह caller के thread में लिखें
+            with self._stats_lock:
+                self.sync_writes += 1
+            self._write([(kind, payload)])
+            return
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stopping:
+                self._drain()
+                return
+
+    def _drain(self):
+        """Stop के बाद queue में बचा सब कुछ flush करता है"""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        for start in range(0, len(batch), self.batch_size):
+            self._write(batch[start:start + self.batch_size])
+
+    def write_now(self, kind, payload):
+        """
+        Queue bypass: caller के thread में अभी commit करता है (durability जरूरी हो तब)।
+        Commit हुआ तो True, retry के बाद भी drop हुआ तो False।
+        """
+        if kind not in self._writers:
+            raise ValueError(f"No writer registered for {kind}")
+        with self._stats_lock:
+            self.submitted += 1
+            self.sync_writes += 1
+            self._in_flight += 1
+        return self._write([(kind, payload)]) == 1
+
+    @staticmethod
+    def _runs(batch):
+        """FIFO क्रम में same kind के लगातार items: [(kind, [payloads]), ...]"""
+        runs = []
+        for kind, payload in batch:
+            if runs and runs[-1][0] == kind:
+                runs[-1][1].append(payload)
+            else:
+                runs.append((kind, [payload]))
+        return runs
+
+    def _commit(self, runs):
+        with self.db.transaction() as conn:
+            for kind, payloads in runs:
+                self._writers[kind](conn, payloads)
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        runs = self._runs(batch)
+        written = len(batch)
+        try:
+            try:
+                self._commit(runs)
+            except Exception as e:
+                # Transient (जैसे lock timeout) हो सकता है - पूरा batch एक बार फिर
+                with self._stats_lock:
+                    self.errors += 1
+                    self.retries += 1
+                self.log(f"Write-behind flush error ({len(batch)} items), retrying: {e}")
+                try:
+                    self._commit(runs)
+                except Exception:
+                    written = self._write_isolated(runs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.written += written
+                self.dropped += len(batch) - written
+                self.batches += 1
+                self._flush_times.append(elapsed)
+                self._in_flight -= len(batch)
+                if self._in_flight <= 0:
+                    self._idle.notify_all()
+        return written
+
+    def _write_isolated(self, runs):
+        """हर kind अलग transaction में; वह भी fail हो तो हर item अलग - लिखे गए items की संख्या"""
+        written = 0
+        for kind, payloads in runs:
+            try:
+                self._commit([(kind, payloads)])
+                written += len(payloads)
+                continue
+            except Exception:
+                pass
+            for payload in payloads:
+                try:
+                    self._commit([(kind, [payload])])
+                    written += 1
+                except Exception as e:
+                    with self._stats_lock:
+                        self.errors += 1
+                    self.log(f"Write-behind dropped {kind} item: {e}")
+        return written
+
+    def flush(self, timeout=5.0):
+        """
+        अब तक submit हुआ हर item commit (या drop) होने तक wait करता है - worker का
+        in-flight batch भी। सब लिख दिया गया तो True, timeout पर False।
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight <= 0, timeout)
+
+    def stop(self, timeout=10.0):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def get_stats(self):
+        with self._stats_lock:
+            times = sorted(self._flush_times)
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_depth': self.max_depth,
+                'submitted': self.submitted,
+                'written': self.written,
+                'batches': self.batches,
+                'avg_batch_size': round(self.written / self.batches, 1) if self.batches else None,
+                'in_flight': self._in_flight,
+                'sync_writes': self.sync_writes,
+                'errors': self.errors,
+                'retries': self.retries,
+                'dropped': self.dropped,
+                'flush_ms_last': round(self._flush_times[-1] * 1000, 3) if times else None,
+                'flush_ms_p50': round(times[len(times) // 2] * 1000, 3) if times else None,
+                'flush_ms_max': round(times[-1] * 1000, 3) if times else None
+            }
@@ -0,0 +1,259 @@
+# pnl_ledger.py
+# Local SQLite ledger of closed orders for fast realized PNL queries
+import threading
+import time
+from datetime import datetime, timedelta
+
+from db import connect
+
+DB_PATH = 'trading_config.db'
+SYNC_LOOKBACK_DAYS = 30
+# Exchange का start_time filter order के creation time पर लगता है, close time पर नहीं।
+# इसलिए हर sync high-water mark से इतना पीछे से re-query करता है, ताकि HWM से पहले बने पर बाद में
+# close हुए orders छूटें नहीं; दोबारा आए orders order_id primary key से dedupe होते हैं।
+SYNC_OVERLAP_SECONDS = 24 * 60 * 60
+
+
+def _to_micros(value):
+    """Delta timestamp (ISO string या microseconds) को unix microseconds में बदलता है।"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        return int(dt.timestamp() * 1000000)
+    except ValueError:
+        return None
+
+
+def _extract_realized_pnl(order):
+    meta = order.get('meta_data') or {}
+    for raw in (meta.get('pnl'), order.get('realized_pnl'), order.get('pnl')):
+        if raw in (None, ''):
+            continue
+        try:
+            return float(str(raw).replace(',', ''))
+        except ValueError:
+            continue
+    return 0.0
+
+
+class RealizedPnlLedger:
+    """
+    Closed orders का local ledger।
+    High-water mark (सबसे नए closed order का close time) से overlap_seconds पहले तक के orders, और
+    पिछली बार open दिखे orders, paginated order-history API से लाता है। start() से sync background
+    thread पर चलता है; realized PNL queries सिर्फ indexed SQLite data से answer होती हैं।
+    """
+
+    def __init__(self, api, db_path=DB_PATH, min_sync_interval=5, overlap_seconds=SYNC_OVERLAP_SECONDS):
+        self.api = api
+        self.db_path = db_path
+        self.min_sync_interval = min_sync_interval
+        self.overlap_seconds = overlap_seconds
+        self.last_sync_time = 0
+        self.sync_interval = None
+        self._lock = threading.Lock()        # SQLite connection
+        self._sync_lock = threading.Lock()   # एक समय पर एक sync
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._conn = connect(db_path)
+        self._init_tables()
+
+    def _init_tables(self):
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS realized_pnl_ledger (
+                    order_id TEXT PRIMARY KEY,
+                    product_symbol TEXT,
+                    side TEXT,
+                    size REAL,
+                    realized_pnl REAL NOT NULL DEFAULT 0,
+                    closed_at INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_realized_pnl_ledger_closed_at
+                ON realized_pnl_ledger (closed_at)
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ledger_open_orders (
+                    order_id TEXT PRIMARY KEY,
+                    created_at INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ledger_sync_state (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER
+                )
+            ''')
+            self._conn.commit()
+
+    def _get_high_water_mark(self):
+        row = self._conn.execute(
+            "SELECT value FROM ledger_sync_state WHERE key = 'high_water_mark'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def _tracked_open_orders(self):
+        """पिछले sync में open दिखे orders: {order_id: created_at micros}"""
+        rows = self._conn.execute('SELECT order_id, created_at FROM ledger_open_orders').fetchall()
+        return dict(rows)
+
+    def _fetch_open_orders(self):
+        """Exchange पर अभी open orders {order_id: created_at micros}; fetch fail हो तो None"""
+        response = self.api.get_open_orders()
+        if not response or not response.get('success'):
+            return None
+        open_orders = {}
+        for order in response.get('result') or []:
+            created_at = _to_micros(order.get('created_at'))
+            if order.get('id') is not None and created_at is not None:
+                open_orders[str(order['id'])] = created_at
+        return open_orders
+
+    def sync(self, force=False):
+        """
+        पिछले sync के बाद के closed orders fetch करके ledger में जोड़ता है।
+        History API का start_time creation time पर filter करता है, इसलिए lower bound
+        HWM - overlap और पिछली बार open दिखे orders के सबसे पुराने created_at में से छोटा है -
+        पहले बना और बाद में close हुआ order (जैसे दो दिन resting limit order) भी import होता है।
+        Network calls ledger lock के बाहर होते हैं, ताकि summary queries wait न करें।
+        Returns: fetched closed orders की संख्या - overlap window के orders भी गिने जाते हैं (error पर -1)
+        """
+        now = time.time()
+        if not force and now - self.last_sync_time < self.min_sync_interval:
+            return 0
+
+        with self._sync_lock:
+            with self._lock:
+                hwm = self._get_high_water_mark()
+                tracked = self._tracked_open_orders()
+            lookback_start = int((now - SYNC_LOOKBACK_DAYS * 24 * 60 * 60) * 1000000)
+            if hwm is None:
+                start_time = lookback_start
+            else:
+                start_time = max(lookback_start, hwm - int(self.overlap_seconds * 1000000))
+            if tracked:
+                start_time = min(start_time, min(tracked.values()))
+
+            # History से पहले open orders - इस बीच close हुआ order history query में आ जाता है
+            open_orders = self._fetch_open_orders()
+
+            rows = []
+            new_hwm = hwm or 0
+            after = None
+            while True:
+                response = self.api.get_order_history(start_time=start_time, after=after)
+                if not response.get('success'):
+                    print(f"PNL ledger sync error: {response.get('error')}")
+                    return -1
+
+                for order in response.get('result', []):
+                    if order.get('state') != 'closed':
+                        continue
+                    closed_at = _to_micros(order.get('updated_at') or order.get('created_at'))
+                    if closed_at is None:
+                        continue
+                    new_hwm = max(new_hwm, closed_at)
+                    rows.append((
+                        str(order.get('id')),
+                        order.get('product_symbol'),
+                        order.get('side'),
+                        float(order.get('size') or 0),
+                        _extract_realized_pnl(order),
+                        closed_at
+                    ))
+
+                after = response.get('after')
+                if not after:
+                    break
+
+            with self._lock, self._conn:
+                self._conn.executemany('''
+                    INSERT OR REPLACE INTO realized_pnl_ledger
+                    (order_id, product_symbol, side, size, realized_pnl, closed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
+                if new_hwm:
+                    self._conn.execute('''
+                        INSERT OR REPLACE INTO ledger_sync_state (key, value)
+                        VALUES ('high_water_mark', ?)
+                    ''', (new_hwm,))
+                if open_orders is not None:
+                    # Open orders fetch fail हुआ तो पुराना set रखें, ताकि अगला sync उन्हें भी cover करे
+                    self._conn.execute('DELETE FROM ledger_open_orders')
+                    self._conn.executemany('INSERT INTO ledger_open_orders (order_id, created_at) VALUES (?, ?)',
+                                           list(open_orders.items()))
+
+            self.last_sync_time = now
+            return len(rows)
+
+    # ============ BACKGROUND SYNC ============
+
+    def start(self, interval=30):
+        """Background thread हर interval seconds (या request_sync पर तुरंत) sync करता है"""
+        self.sync_interval = interval
+        self._thread = threading.Thread(target=self._run, name='pnl-ledger-sync', daemon=True)
+        self._thread.start()
+
+    def request_sync(self):
+        """अगला background sync अभी (जैसे exit के बाद)"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                self.sync(force=True)
+            except Exception as e:
+                print(f"PNL ledger sync error: {e}")
+            self._wake.wait(self.sync_interval)
+            self._wake.clear()
+
+    # ============ QUERIES ============
+
+    def _sum_since(self, since_micros):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT COALESCE(SUM(realized_pnl), 0) FROM realized_pnl_ledger WHERE closed_at >= ?',
+                (since_micros,)
+            ).fetchone()
+        return round(row[0], 2)
+
+    def last_trade_pnl(self):
+        """Last closed order का realized PNL"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT realized_pnl FROM realized_pnl_ledger ORDER BY closed_at DESC LIMIT 1'
+            ).fetchone()
+        return round(row[0], 2) if row else 0.0
+
+    def today_pnl(self):
+        """आज (local midnight से) का realized PNL"""
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self._sum_since(int(midnight.timestamp() * 1000000))
+
+    def pnl_last_days(self, days=30):
+        """पिछले N दिनों का realized PNL"""
+        since = datetime.now() - timedelta(days=days)
+        return self._sum_since(int(since.timestamp() * 1000000))
+
+    def summary(self):
+        """Local ledger से totals - कोई network call नहीं (sync background में)"""
+        return {
+            'last_trade_realized_pnl': self.last_trade_pnl(),
+            'today_realized_pnl': self.today_pnl(),
+            'realized_pnl_30d': self.pnl_last_days(30)
+        }
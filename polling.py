@@ -0,0 +1,77 @@
+# polling.py
+# Adaptive REST polling cadence: poll faster when price is close to an armed level
+import math
+import time
+from collections import deque
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class AdaptivePollInterval:
+    """
+    अगला poll interval = वह समय जिसमें price के nearest armed level तक पहुँचने की संभावना
+    z standard deviations जितनी कम रहे:  interval = (distance / (z * sigma_per_sec)) ** 2
+    sigma_per_sec हाल के samples की realized volatility है (running sums, O(1) प्रति sample);
+    पर्याप्त samples न हों तो default_annual_vol से। Result [min_interval, max_interval] में clamp होता है।
+    """
+
+    def __init__(self, min_interval=0.5, max_interval=5.0, z=3.0, window=120, default_annual_vol=0.6):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.z = z
+        self.default_annual_vol = default_annual_vol
+        self.interval = max_interval
+        self.reason = 'not started'
+        self._samples = deque(maxlen=window)   # (dt, squared log return)
+        self._sum_dt = 0.0
+        self._sum_sq = 0.0
+        self._last = None
+
+    def observe(self, price, ts=None):
+        """हर नए price sample (stream या REST) पर call करें"""
+        ts = time.time() if ts is None else ts
+        if self._last is not None and price > 0 and self._last[1] > 0:
+            dt = ts - self._last[0]
+            if dt > 0:
+                if len(self._samples) == self._samples.maxlen:
+                    old_dt, old_sq = self._samples[0]
+                    self._sum_dt -= old_dt
+                    self._sum_sq -= old_sq
+                sq = math.log(price / self._last[1]) ** 2
+                self._samples.append((dt, sq))
+                self._sum_dt += dt
+                self._sum_sq += sq
+        self._last = (ts, price)
+
+    def sigma_per_second(self):
+        """Relative volatility per sqrt(second)"""
+        if len(self._samples) >= 10 and self._sum_dt > 0 and self._sum_sq > 0:
+            return math.sqrt(self._sum_sq / self._sum_dt)
+        return self.default_annual_vol / math.sqrt(SECONDS_PER_YEAR)
+
+    def next_interval(self, price, levels):
+        """levels: armed price levels (None ignored) - (interval, reason) return करता है"""
+        levels = [level for level in levels if level is not None]
+        if not price or not levels:
+            self.interval, self.reason = self.max_interval, 'no armed levels'
+            return self.interval, self.reason
+
+        nearest = min(levels, key=lambda level: abs(level - price))
+        distance = abs(nearest - price) / price
+        sigma = self.sigma_per_second()
+        raw = (distance / (self.z * sigma)) ** 2
+        interval = min(self.max_interval, max(self.min_interval, raw))
+
+        self.interval = round(interval, 3)
+        self.reason = (f"nearest level {nearest:.1f} is ${abs(nearest - price):.1f} away, "
+                       f"realized vol {sigma * math.sqrt(SECONDS_PER_YEAR) * 100:.0f}% ann.")
+        return self.interval, self.reason
+
+    def get_status(self):
+        return {
+            'interval': self.interval,
+            'reason': self.reason,
+            'min_interval': self.min_interval,
+            'max_interval': self.max_interval,
+            'realized_vol_annual': round(self.sigma_per_second() * math.sqrt(SECONDS_PER_YEAR), 4)
+        }
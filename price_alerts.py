@@ -0,0 +1,92 @@
+# price_alerts.py
+# BTC price alerts: sorted above/below index in memory, persisted in SQLite
+import threading
+import uuid
+from datetime import datetime
+
+from db import get_database
+from price_levels import PriceLevelIndex
+
+DB_PATH = 'trading_config.db'
+
+
+class PriceAlertBook:
+    """
+    BTC price alerts का store।
+    Alerts PriceLevelIndex में रहते हैं, इसलिए हर tick पर सिर्फ crossed alerts pop होते हैं
+    (हजारों alerts पर भी O(log n) प्रति fired alert)। हर add/delete SQLite (shared WAL db.py
+    connections) में भी लिखा जाता है ताकि restart के बाद alerts वापस load हो जाएँ।
+    pop_crossed सिर्फ memory बदलता है - fired alerts की DB delete delete_fired से notifier
+    thread पर होती है, इसलिए price tick path disk commit का wait नहीं करता।
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.db = get_database(db_path)
+        self.index = PriceLevelIndex()
+        self._alerts = {}
+        self._lock = threading.Lock()
+        self._init_table()
+        self._load()
+
+    def _init_table(self):
+        with self.db.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS btc_price_alerts (
+                    id TEXT PRIMARY KEY,
+                    price REAL NOT NULL,
+                    condition TEXT NOT NULL,
+                    created_at TEXT
+                )
+            ''')
+
+    def _load(self):
+        rows = self.db.query('SELECT id, price, condition, created_at FROM btc_price_alerts')
+        with self._lock:
+            for alert_id, price, condition, created_at in rows:
+                self.index.add(alert_id, price, condition)
+                self._alerts[alert_id] = {'id': alert_id, 'price': price, 'condition': condition,
+                                          'created_at': created_at}
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def add(self, price, condition):
+        """condition: 'above' या 'below' - invalid होने पर ValueError"""
+        alert = {
+            'id': str(uuid.uuid4()),
+            'price': float(price),
+            'condition': condition,
+            'created_at': datetime.utcnow().isoformat()
+        }
+        with self._lock:
+            self.index.add(alert['id'], alert['price'], condition)
+            self._alerts[alert['id']] = alert
+        self.db.execute(
+            'INSERT INTO btc_price_alerts (id, price, condition, created_at) VALUES (?, ?, ?, ?)',
+            (alert['id'], alert['price'], condition, alert['created_at'])
+        )
+        return alert
+
+    def remove(self, alert_id):
+        with self._lock:
+            if self._alerts.pop(alert_id, None) is None:
+                return False
+            self.index.remove(alert_id)
+        self.db.execute('DELETE FROM btc_price_alerts WHERE id = ?', (alert_id,))
+        return True
+
+    def all(self):
+        with self._lock:
+            return [dict(alert) for alert in self._alerts.values()]
+
+    def pop_crossed(self, high, low=None):
+        """[low, high] में cross हुए alerts memory से हटाकर return करता है (कोई I/O नहीं)"""
+        with self._lock:
+            return [self._alerts.pop(alert_id) for alert_id in self.index.pop_crossed(high, low)
+                    if alert_id in self._alerts]
+
+    def delete_fired(self, alerts):
+        """pop_crossed से मिले alerts DB से एक transaction में delete करता है (tick path के बाहर call करें)"""
+        if alerts:
+            self.db.executemany('DELETE FROM btc_price_alerts WHERE id = ?', [(alert['id'],) for alert in alerts])
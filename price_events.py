@@ -0,0 +1,162 @@
+# price_events.py
+# In-process publish/subscribe dispatcher for BTC price ticks
+import threading
+import time
+from collections import deque, namedtuple
+
+# high/low: subscriber की पिछली evaluation के बाद का running max/min (price भी शामिल)
+PriceTick = namedtuple('PriceTick', ['price', 'ts', 'high', 'low'])
+
+LAG_WINDOW = 256
+
+
+class Subscription:
+    """
+    एक subscriber: अपनी bounded queue और अपना delivery thread।
+    Queue भरने पर सबसे पुराना tick drop होता है, ताकि slow consumer publisher या
+    दूसरे subscribers को कभी block न करे। Drop हुए tick की high/low अगले queued tick
+    में merge हो जाती है - इसलिए हर delivered tick की high/low पिछली delivery के बाद
+    आए सभी prices को cover करती है (O(1) memory), और बीच का कोई wick miss नहीं होता।
+    """
+
+    def __init__(self, name, handler, maxsize=256, log=print, clock=time.time):
+        self.name = name
+        self.handler = handler
+        self.maxsize = maxsize
+        self.log = log
+        self.clock = clock
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.lags = deque(maxlen=LAG_WINDOW)
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"price-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def put(self, tick):
+        with self._cond:
+            if len(self._queue) >= self.maxsize:
+                oldest = self._queue.popleft()
+                self.dropped += 1
+                if self._queue:
+                    head = self._queue[0]
+                    self._queue[0] = head._replace(high=max(head.high, oldest.high),
+                                                   low=min(head.low, oldest.low))
+                else:
+                    tick = tick._replace(high=max(tick.high, oldest.high),
+                                         low=min(tick.low, oldest.low))
+            self._queue.append(tick)
+            if len(self._queue) > self.max_depth:
+                self.max_depth = len(self._queue)
+            self._cond.notify()
+
+    def deliver(self, tick):
+        """एक tick handler को देता है और publish-to-handle lag record करता है"""
+        try:
+            self.handler(tick)
+        except Exception as e:
+            self.errors += 1
+            self.log(f"Price subscriber '{self.name}' error: {e}")
+        self.delivered += 1
+        self.lags.append(self.clock() - tick.ts)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                tick = self._queue.popleft()
+            self.deliver(tick)
+
+    def get_stats(self):
+        lags = sorted(self.lags)
+        return {
+            'queue_depth': len(self._queue),
+            'max_depth': self.max_depth,
+            'maxsize': self.maxsize,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'lag_last_ms': round(self.lags[-1] * 1000, 3) if self.lags else None,
+            'lag_p50_ms': round(lags[len(lags) // 2] * 1000, 3) if lags else None,
+            'lag_max_ms': round(lags[-1] * 1000, 3) if lags else None
+        }
+
+
+class PriceDispatcher:
+    """
+    Price feed (WebSocket या REST fallback) publish(price) call करता है और हर subscriber
+    को tick उसकी अपनी queue में मिलता है। Consumers को live_price sleep-poll नहीं करना पड़ता।
+    synchronous=True पर कोई thread/queue नहीं - publish ही handlers को क्रम से call करता है
+    (deterministic replay के लिए)।
+    """
+
+    def __init__(self, log=print, clock=time.time, synchronous=False):
+        self.log = log
+        self.clock = clock
+        self.synchronous = synchronous
+        self.published = 0
+        self.last_tick = None
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, name, handler, maxsize=256):
+        """handler(tick) हर PriceTick पर subscriber के अपने thread पर call होगा"""
+        subscription = Subscription(name, handler, maxsize=maxsize, log=self.log, clock=self.clock)
+        with self._lock:
+            old = self._subscribers.get(name)
+            self._subscribers[name] = subscription
+        if old:
+            old.stop()
+        if not self.synchronous:
+            subscription.start()
+        return subscription
+
+    def unsubscribe(self, name):
+        with self._lock:
+            subscription = self._subscribers.pop(name, None)
+        if subscription:
+            subscription.stop()
+        return subscription is not None
+
+    def publish(self, price, ts=None):
+        tick = PriceTick(price, self.clock() if ts is None else ts, price, price)
+        with self._lock:
+            self.published += 1
+            self.last_tick = tick
+            subscribers = list(self._subscribers.values())
+        for subscription in subscribers:
+            if self.synchronous:
+                subscription.deliver(tick)
+            else:
+                subscription.put(tick)
+        return tick
+
+    def stop(self):
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for subscription in subscribers:
+            subscription.stop()
+
+    def get_stats(self):
+        with self._lock:
+            subscribers = dict(self._subscribers)
+        return {
+            'published': self.published,
+            'last_price': self.last_tick.price if self.last_tick else None,
+            'subscribers': {name: s.get_stats() for name, s in subscribers.items()}
+        }
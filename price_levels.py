@@ -0,0 +1,95 @@
+# price_levels.py
+# Sorted above/below price-level index shared by trigger orders and price alerts
+import heapq
+import itertools
+import threading
+
+
+class PriceLevelIndex:
+    """
+    'above' और 'below' levels को दो heaps में रखता है।
+    - above: min-heap, level तब cross होता है जब price >= level
+    - below: max-heap (negated), level तब cross होता है जब price <= level
+    हर tick पर सिर्फ crossed levels pop होते हैं - O(log n) प्रति fired item।
+    Remove lazy है (O(1)); stale heap entries pop के समय skip होती हैं।
+    """
+
+    def __init__(self):
+        self._above = []
+        self._below = []
+        self._live = {}   # item_id -> (condition, price, seq)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, item_id):
+        return item_id in self._live
+
+    def add(self, item_id, price, condition):
+        """condition: 'above' या 'below'"""
+        if condition not in ('above', 'below'):
+            raise ValueError(f"Invalid trigger condition: {condition}")
+        price = float(price)
+        with self._lock:
+            seq = next(self._seq)
+            self._live[item_id] = (condition, price, seq)
+            if condition == 'above':
+                heapq.heappush(self._above, (price, seq, item_id))
+            else:
+                heapq.heappush(self._below, (-price, seq, item_id))
+
+    def remove(self, item_id):
+        with self._lock:
+            removed = self._live.pop(item_id, None) is not None
+            if removed and len(self._above) + len(self._below) > 2 * len(self._live) + 64:
+                self._compact()
+            return removed
+
+    def _compact(self):
+        """Cancelled (stale) heap entries हटाकर heaps rebuild करता है"""
+        self._above = [e for e in self._above if self._is_live(e[1], e[2])]
+        self._below = [e for e in self._below if self._is_live(e[1], e[2])]
+        heapq.heapify(self._above)
+        heapq.heapify(self._below)
+
+    def _is_live(self, seq, item_id):
+        entry = self._live.get(item_id)
+        return entry is not None and entry[2] == seq
+
+    def pop_crossed(self, high, low=None):
+        """
+        Interval [low, high] में cross हुए सभी items index से निकालकर return करता है।
+        Single price sample के लिए low छोड़ दें।
+        """
+        if low is None:
+            low = high
+        fired = []
+        with self._lock:
+            while self._above and self._above[0][0] <= high:
+                price, seq, item_id = heapq.heappop(self._above)
+                if self._is_live(seq, item_id):
+                    del self._live[item_id]
+                    fired.append(item_id)
+            while self._below and -self._below[0][0] >= low:
+                neg_price, seq, item_id = heapq.heappop(self._below)
+                if self._is_live(seq, item_id):
+                    del self._live[item_id]
+                    fired.append(item_id)
+        return fired
+
+    def _clean_top(self, heap):
+        while heap and not self._is_live(heap[0][1], heap[0][2]):
+            heapq.heappop(heap)
+
+    def nearest(self):
+        """
+        सबसे पास के armed levels: (lowest above level, highest below level), न हो तो None।
+        """
+        with self._lock:
+            self._clean_top(self._above)
+            self._clean_top(self._below)
+            above = self._above[0][0] if self._above else None
+            below = -self._below[0][0] if self._below else None
+        return above, below
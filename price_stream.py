@@ -0,0 +1,179 @@
+# price_stream.py
+# Delta Exchange WebSocket ticker feed for BTC live price
+import json
+import os
+import threading
+import time
+
+try:
+    import websocket  # websocket-client package
+except ImportError:
+    websocket = None
+
+DEFAULT_WS_URL = "wss://socket.india.delta.exchange"
+
+
+def parse_price_message(message, symbol="BTCUSD"):
+    """
+    WebSocket message से mark price निकालता है।
+    v2/ticker और mark_price दोनों channels support करता है, बाकी messages पर None।
+    """
+    try:
+        data = json.loads(message) if isinstance(message, (str, bytes)) else message
+    except (TypeError, ValueError):
+        return None
+
+    if not isinstance(data, dict):
+        return None
+
+    msg_type = data.get("type")
+    msg_symbol = data.get("symbol")
+
+    if msg_type == "v2/ticker" and msg_symbol == symbol:
+        price = data.get("mark_price")
+    elif msg_type == "mark_price" and msg_symbol == f"MARK:{symbol}":
+        price = data.get("price")
+    else:
+        return None
+
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+class DeltaPriceStream:
+    """
+    Delta Exchange के ticker channel को subscribe करके हर tick on_price callback को देता है।
+    Connection टूटने पर exponential backoff के साथ अपने आप reconnect करता है।
+    url parameter (या DELTA_WS_URL env) से local stand-in server पर भी चलाया जा सकता है।
+    """
+
+    def __init__(self, on_price, url=None, symbol="BTCUSD", stale_after=5,
+                 reconnect_delay=1, max_reconnect_delay=30, log=print):
+        self.on_price = on_price
+        self.url = url or os.getenv("DELTA_WS_URL", DEFAULT_WS_URL)
+        self.symbol = symbol
+        self.stale_after = stale_after
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.log = log
+
+        self.connected = False
+        self.stopped = False
+        self.last_tick_time = None
+        self.last_price = None
+        self.tick_count = 0
+        self.reconnect_count = 0
+
+        self._ws = None
+        self._thread = None
+
+    @property
+    def available(self):
+        return websocket is not None
+
+    def start(self):
+        """Background thread में stream शुरू करता है। websocket-client न हो तो False।"""
+        if not self.available:
+            self.log("websocket-client not installed - using REST price polling only")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        self.stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self.stopped = True
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def is_live(self):
+        """True अगर socket connected है और पिछला tick stale_after seconds के अंदर आया।"""
+        if not self.connected or self.last_tick_time is None:
+            return False
+        return (time.time() - self.last_tick_time) <= self.stale_after
+
+    def get_status(self):
+        return {
+            'url': self.url,
+            'connected': self.connected,
+            'live': self.is_live(),
+            'last_price': self.last_price,
+            'last_tick_age': (time.time() - self.last_tick_time) if self.last_tick_time else None,
+            'tick_count': self.tick_count,
+            'reconnect_count': self.reconnect_count
+        }
+
+    # ============ INTERNAL ============
+
+    def _subscribe_message(self):
+        return json.dumps({
+            "type": "subscribe",
+            "payload": {
+                "channels": [
+                    {"name": "v2/ticker", "symbols": [self.symbol]},
+                    {"name": "mark_price", "symbols": [f"MARK:{self.symbol}"]}
+                ]
+            }
+        })
+
+    def _on_open(self, ws):
+        self.connected = True
+        ws.send(self._subscribe_message())
+        self.log(f"Price stream connected: {self.url}")
+
+    def _on_message(self, ws, message):
+        price = parse_price_message(message, self.symbol)
+        if price is None:
+            return
+        self.last_tick_time = time.time()
+        self.last_price = price
+        self.tick_count += 1
+        try:
+            self.on_price(price)
+        except Exception as e:
+            self.log(f"Price stream callback error: {e}")
+
+    def _on_error(self, ws, error):
+        self.log(f"Price stream error: {error}")
+
+    def _on_close(self, ws, status_code=None, close_msg=None):
+        self.connected = False
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self.stopped:
+            ticks_before = self.tick_count
+            try:
+                self._ws = websocket.WebSocketApp(
+                    self.url,
+                    on_open=self._on_open,
+                    on_message=self._on_message,
+                    on_error=self._on_error,
+                    on_close=self._on_close
+                )
+                self._ws.run_forever(ping_interval=15, ping_timeout=10)
+            except Exception as e:
+                self.log(f"Price stream run error: {e}")
+            finally:
+                self.connected = False
+                self._ws = None
+
+            if self.stopped:
+                break
+
+            # जिस connection पर ticks आए थे उसके बाद backoff reset करें
+            if self.tick_count > ticks_before:
+                delay = self.reconnect_delay
+            self.reconnect_count += 1
+            self.log(f"Price stream disconnected, reconnecting in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
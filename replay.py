@@ -0,0 +1,338 @@
+# replay.py
+# Deterministic tick replay for index exits, BTC alerts and trigger orders on a simulated clock
+#
+# Usage:
+#   python replay.py                                # synthetic 24h, 1 tick/s
+#   python replay.py --ticks ticks.csv --below 64000 --below-type sl --triggers 500
+# Tick files: CSV with "ts,price" rows (header optional) or JSON lines {"ts": .., "price": ..}
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from deltaprotraderweb import DeltaExchangeAPI, TradingBot
+from scheduler import DeadlineScheduler
+from trigger_engine import TriggerOrderEngine
+from trigger_execution import TriggerOrderExecutor
+from trigger_store import TriggerOrderStore
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class SimClock:
+    """Replay का clock - सिर्फ replay loop और stubbed API calls इसे आगे बढ़ाते हैं"""
+
+    def __init__(self, start=0.0):
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self._now
+
+    def set(self, ts):
+        with self._lock:
+            self._now = max(self._now, float(ts))
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += seconds
+
+
+class LazyExecutor:
+    """
+    exit_executor का deterministic stand-in: submit किया गया काम result() पर उसी thread में चलता है,
+    इसलिए simulated latencies हर run में एक जैसी आती हैं।
+    """
+
+    class _Future:
+        def __init__(self, fn, args, kwargs):
+            self._call = (fn, args, kwargs)
+            self._done = False
+            self._result = None
+
+        def result(self, timeout=None):
+            if not self._done:
+                fn, args, kwargs = self._call
+                self._result = fn(*args, **kwargs)
+                self._done = True
+            return self._result
+
+    def submit(self, fn, *args, **kwargs):
+        return self._Future(fn, args, kwargs)
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+
+class StubDeltaExchangeAPI:
+    """
+    DeltaExchangeAPI का offline stand-in।
+    हर exchange call clock को latency seconds आगे बढ़ाती है और calls में record होती है।
+    """
+
+    api_key = 'replay'
+
+    def __init__(self, clock, latency=0.08):
+        self.clock = clock
+        self.latency = latency
+        self.calls = []
+        self.orders = {}   # client_order_id -> order
+        self._ids = itertools.count(1)
+
+    def _call(self, name, **details):
+        self.clock.advance(self.latency)
+        self.calls.append({'ts': self.clock(), 'call': name, **details})
+
+    # Retry/lookup logic असली API जैसी ही रहे
+    place_market_order_idempotent = DeltaExchangeAPI.place_market_order_idempotent
+
+    def place_market_order(self, product_id, side, size, client_order_id=None):
+        self._call('place_market_order', product_id=product_id, side=side, size=size)
+        if client_order_id and client_order_id in self.orders:
+            return {"error": "400 - duplicate client_order_id", "success": False, "status_code": 400}
+        order = {'id': next(self._ids), 'product_id': product_id, 'side': side, 'size': size,
+                 'client_order_id': client_order_id, 'state': 'closed'}
+        if client_order_id:
+            self.orders[client_order_id] = order
+        return {"success": True, "result": order}
+
+    def get_order_by_client_id(self, client_order_id):
+        self._call('get_order_by_client_id')
+        return {"success": True, "result": self.orders.get(client_order_id)}
+
+    def square_off_all(self):
+        self._call('square_off_all')
+        return {"success": True}
+
+    def cancel_all_orders(self, product_id=None):
+        self._call('cancel_all_orders')
+        return {"success": True}
+
+    def get_open_orders(self):
+        return {"success": True, "result": []}
+
+    def cancel_order(self, order_id):
+        self._call('cancel_order')
+        return {"success": True}
+
+    def get_margined_positions(self):
+        return {"success": True, "result": []}
+
+    def get_order_history(self, start_time=None, after=None, page_size=100):
+        return {"success": True, "result": [], "after": None}
+
+
+def load_ticks(path):
+    """CSV (ts,price) या JSON lines tick file पढ़ता है - (ts, price) tuples"""
+    ticks = []
+    with open(path) as f:
+        if path.endswith(('.jsonl', '.json')):
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    ticks.append((float(row['ts']), float(row['price'])))
+        else:
+            for row in csv.reader(f):
+                try:
+                    ticks.append((float(row[0]), float(row[1])))
+                except (ValueError, IndexError):
+                    continue   # header / blank line
+    ticks.sort()
+    return ticks
+
+
+def synthetic_ticks(start_price=65000.0, hours=24, interval=1.0, annual_vol=0.6, start_ts=0.0, seed=7):
+    """Seeded geometric random walk - same seed, same ticks"""
+    rng = random.Random(seed)
+    sigma = annual_vol * math.sqrt(interval / SECONDS_PER_YEAR)
+    price = start_price
+    ticks = []
+    for i in range(int(hours * 3600 / interval)):
+        price *= math.exp(rng.gauss(0, sigma) - sigma * sigma / 2)
+        ticks.append((start_ts + i * interval, round(price, 1)))
+    return ticks
+
+
+class TickReplay:
+    """
+    TradingBot (index exits, exit countdown, BTC alerts) और trigger engine/store/expiry को
+    app जैसी wiring के साथ simulated clock पर चलाता है। कोई thread, network या real sleep नहीं।
+    """
+
+    def __init__(self, start_ts=0.0, latency=0.08):
+        self.clock = SimClock(start_ts)
+        self.api = StubDeltaExchangeAPI(self.clock, latency=latency)
+        self.notifications = []
+        self.logs = []
+        self.fired_alerts = []
+        self.fired_orders = []
+        self.expired_orders = []
+        self.trades = []
+
+        # Temp file DB: alerts/ledger background threads को भी वही database दिखे (':memory:' per-connection है)
+        self._tmpdir = tempfile.TemporaryDirectory(prefix='replay-')
+        self.bot = TradingBot(api=self.api, clock=self.clock, start_threads=False,
+                              db_path=os.path.join(self._tmpdir.name, 'replay.db'),
+                              notifier=self.notifications.append, latency_clock=self.clock)
+        self.bot.log_message = self.logs.append
+        self.bot.exit_executor = LazyExecutor()
+        alerts_pop = self.bot.btc_price_alerts.pop_crossed
+
+        def record_alerts(high, low=None):
+            fired = alerts_pop(high, low)
+            self.fired_alerts.extend({**alert, 'ts': self.clock()} for alert in fired)
+            return fired
+        self.bot.btc_price_alerts.pop_crossed = record_alerts
+
+        self.store = TriggerOrderStore()
+        self.expiry = DeadlineScheduler(self._expire, clock=self.clock, name='replay-expiry')
+        self.executor = TriggerOrderExecutor(self.store, self.api, expiry=self.expiry, save_trade=self.trades.append,
+                                             notify=self.notifications.append, clock=self.clock)
+        self.engine = TriggerOrderEngine(self.store, self._execute_trigger, log=self.logs.append, clock=self.clock)
+        self.bot.price_events.subscribe('trigger_orders', self.engine.on_tick)
+
+    # ---- setup ----
+
+    def set_exit_levels(self, above=None, above_type=None, below=None, below_type=None):
+        self.bot.set_index_exit_params(above_price=above, below_price=below, above_type=above_type, below_type=below_type)
+
+    def add_trigger_order(self, trigger_price, condition, side='buy', size=1, product_id=1, time_limit=None):
+        order = {
+            'id': str(uuid.UUID(int=len(self.store) + len(self.fired_orders) + len(self.expired_orders) + 1)),
+            'symbol': f'C-BTC-{int(trigger_price)}-REPLAY',
+            'product_id': product_id,
+            'side': side,
+            'size': size,
+            'trigger_price': trigger_price,
+            'trigger_condition': condition,
+            'status': 'pending',
+            'time_limit': time_limit,
+            'expires_at': self.clock() + time_limit * 60 if time_limit else None
+        }
+        self.store.add(order)
+        if order['expires_at']:
+            self.expiry.schedule(order['id'], order['expires_at'])
+        return order
+
+    def add_alert(self, price, condition):
+        return self.bot.add_btc_alert(price, condition)
+
+    # ---- app wiring mirrors option_trading_app ----
+
+    def _execute_trigger(self, order, price):
+        """App वाला TriggerOrderExecutor चलाता है, फिर report के लिए result record करता है"""
+        self.executor(order, price)
+        timing = order.get('timing') or {}
+        self.fired_orders.append({
+            'id': order['id'],
+            'trigger': f"{order['trigger_condition']} {order['trigger_price']}",
+            'tick_price': price,
+            'fired_at': order['fired_at'],
+            'ack_ms': round(timing.get('ack_ms', 0), 1),
+            'total_ms': round(timing.get('total_ms', 0), 1),
+            'status': order['status']
+        })
+
+    def _expire(self, due):
+        for order_id, _ in due:
+            order = self.store.transition(order_id, 'expired')
+            if order is not None:
+                self.expired_orders.append({'id': order_id, 'expired_at': self.clock()})
+
+    # ---- replay ----
+
+    def _run_timers_until(self, ts):
+        """ts से पहले due हुए timers उनकी अपनी deadline पर fire करता है (tick के समय पर नहीं)"""
+        schedulers = (self.bot.exit_timer, self.expiry)
+        while True:
+            deadlines = [(d, s) for s in schedulers for d in (s.next_deadline(),) if d is not None and d <= ts]
+            if not deadlines:
+                return
+            deadline, scheduler = min(deadlines, key=lambda item: item[0])
+            self.clock.set(deadline)
+            scheduler.run_due(max(deadline, self.clock()))
+
+    def run(self, ticks):
+        wall_start = time.perf_counter()
+        for ts, price in ticks:
+            self._run_timers_until(ts)
+            self.clock.set(ts)
+            self.bot._apply_price(price)
+        self._run_timers_until(self.clock())
+        wall_s = time.perf_counter() - wall_start
+        return self.report(ticks, wall_s)
+
+    def report(self, ticks, wall_s):
+        exits = list(self.bot.exit_latencies)
+        total_ms = sorted(o['total_ms'] for o in self.fired_orders)
+        return {
+            'ticks': len(ticks),
+            'simulated_hours': round((ticks[-1][0] - ticks[0][0]) / 3600, 2) if ticks else 0,
+            'wall_seconds': round(wall_s, 3),
+            'ticks_per_second': round(len(ticks) / wall_s) if wall_s else None,
+            'exits': exits,
+            'trigger_orders': {
+                'fired': len(self.fired_orders),
+                'expired': len(self.expired_orders),
+                'resting': len(self.store),
+                'fill_ms_p50': total_ms[len(total_ms) // 2] if total_ms else None,
+                'fill_ms_max': total_ms[-1] if total_ms else None,
+                'first': self.fired_orders[:10]
+            },
+            'alerts_fired': len(self.fired_alerts),
+            'exchange_calls': len(self.api.calls)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay BTC ticks through the exit, alert and trigger engines')
+    parser.add_argument('--ticks', help='CSV (ts,price) or JSON lines tick file; synthetic if omitted')
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--interval', type=float, default=1.0, help='synthetic tick interval (s)')
+    parser.add_argument('--start-price', type=float, default=65000.0)
+    parser.add_argument('--vol', type=float, default=0.6, help='synthetic annualised volatility')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--above', type=float)
+    parser.add_argument('--above-type', choices=('sl', 'target'))
+    parser.add_argument('--below', type=float)
+    parser.add_argument('--below-type', choices=('sl', 'target'))
+    parser.add_argument('--triggers', type=int, default=200, help='random trigger orders around the first price')
+    parser.add_argument('--alerts', type=int, default=200, help='random BTC alerts around the first price')
+    parser.add_argument('--time-limit', type=int, help='trigger order time limit (minutes)')
+    parser.add_argument('--latency-ms', type=float, default=80, help='simulated exchange latency per call')
+    args = parser.parse_args()
+
+    if args.ticks:
+        ticks = load_ticks(args.ticks)
+    else:
+        ticks = synthetic_ticks(args.start_price, args.hours, args.interval, args.vol, seed=args.seed)
+    if not ticks:
+        raise SystemExit('No ticks to replay')
+
+    replay = TickReplay(start_ts=ticks[0][0], latency=args.latency_ms / 1000)
+    first_price = ticks[0][1]
+    replay.set_exit_levels(args.above, args.above_type, args.below, args.below_type)
+
+    rng = random.Random(args.seed)
+    for i in range(args.triggers):
+        condition = 'above' if i % 2 else 'below'
+        offset = rng.uniform(0.002, 0.05) * first_price
+        replay.add_trigger_order(round(first_price + offset if condition == 'above' else first_price - offset, 1),
+                                 condition, time_limit=args.time_limit)
+    for i in range(args.alerts):
+        condition = 'above' if i % 2 else 'below'
+        offset = rng.uniform(0.002, 0.05) * first_price
+        replay.add_alert(round(first_price + offset if condition == 'above' else first_price - offset, 1), condition)
+
+    print(json.dumps(replay.run(ticks), indent=2, default=str))
+
+
+if __name__ == '__main__':
+    main()
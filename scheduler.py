@@ -0,0 +1,108 @@
+# scheduler.py
+# Min-heap deadline scheduler - wakes exactly at the next deadline and fires due entries in bulk
+import heapq
+import itertools
+import threading
+import time
+
+
+class DeadlineScheduler:
+    """
+    Keys को deadlines के साथ schedule करता है और deadline आने पर on_due([(key, payload), ...]) call करता है।
+    - Thread सिर्फ अगली deadline तक sleep करता है (कोई fixed polling नहीं)
+    - एक साथ due हुई सभी entries एक ही batch में जाती हैं
+    - cancel(key) O(1) है (lazy deletion)
+    clock inject किया जा सकता है; run_due(now) को thread के बिना भी call कर सकते हैं।
+    """
+
+    def __init__(self, on_due, clock=time.time, name='scheduler'):
+        self.on_due = on_due
+        self.clock = clock
+        self.name = name
+        self._heap = []
+        self._entries = {}   # key -> (deadline, seq, payload)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def schedule(self, key, deadline, payload=None):
+        """Key को deadline (clock seconds) पर schedule करता है; पुराना timer replace होता है"""
+        with self._cond:
+            seq = next(self._seq)
+            self._entries[key] = (deadline, seq, payload)
+            heapq.heappush(self._heap, (deadline, seq, key))
+            # नई entry सबसे पहली है तो sleeping thread को जगाएं
+            if self._heap[0][1] == seq:
+                self._cond.notify()
+
+    def cancel(self, key):
+        """Timer हटाता है - heap entry lazy तरीके से बाद में skip होती है"""
+        with self._cond:
+            removed = self._entries.pop(key, None) is not None
+            if removed and len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [(d, seq, k) for k, (d, seq, _) in self._entries.items()]
+                heapq.heapify(self._heap)
+            return removed
+
+    def next_deadline(self):
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, seq, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == seq:
+                del self._entries[key]
+                due.append((key, entry[2]))
+        return due
+
+    def run_due(self, now=None):
+        """अभी तक due सभी entries एक batch में fire करता है; fired entries return करता है"""
+        with self._cond:
+            due = self._pop_due(self.clock() if now is None else now)
+        if due:
+            try:
+                self.on_due(due)
+            except Exception as e:
+                print(f"{self.name} on_due error: {e}")
+        return due
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    self._drop_stale()
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - self.clock()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if self._stopped:
+                    return
+            self.run_due()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Modules repo root पर हैं (package नहीं)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,86 @@
+import json
+import time
+
+import pytest
+
+from price_stream import DeltaPriceStream
+from ws_standin import StandInWebSocketServer, ticker_frame
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def make(scripts):
+        server = StandInWebSocketServer(scripts).start()
+        servers.append(server)
+        return server
+    yield make
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def stream_factory():
+    streams = []
+
+    def make(url, prices, **kwargs):
+        kwargs.setdefault('reconnect_delay', 0.05)
+        stream = DeltaPriceStream(prices.append, url=url, log=lambda msg: None, **kwargs)
+        streams.append(stream)
+        assert stream.start()
+        return stream
+    yield make
+    for stream in streams:
+        stream.stop()
+
+
+def test_reconnects_and_resubscribes_after_drop(standin, stream_factory):
+    server = standin([
+        {'frames': [ticker_frame(65000.5), ticker_frame(65001.0)], 'then': 'close'},
+        {'frames': [ticker_frame(65010.0)], 'then': 'hold'},
+    ])
+    prices = []
+    stream = stream_factory(server.url, prices)
+
+    assert wait_for(lambda: prices[-1:] == [65010.0])
+    assert prices == [65000.5, 65001.0, 65010.0]
+    assert server.connections == 2
+    assert stream.reconnect_count == 1
+    for messages in server.received:
+        subscribe = json.loads(messages[0])
+        assert subscribe['type'] == 'subscribe'
+        assert {c['name'] for c in subscribe['payload']['channels']} == {'v2/ticker', 'mark_price'}
+    assert stream.connected and stream.is_live()
+
+
+def test_gap_marks_stream_stale_without_dropping_connection(standin, stream_factory):
+    server = standin([{'frames': [ticker_frame(64000.0)], 'then': 'hold'}])
+    prices = []
+    stream = stream_factory(server.url, prices, stale_after=0.2)
+
+    assert wait_for(lambda: prices == [64000.0])
+    assert stream.is_live()
+    # Connection open, पर frames बंद - REST fallback के लिए stream stale दिखनी चाहिए
+    assert wait_for(lambda: not stream.is_live(), timeout=2.0)
+    assert stream.connected
+    assert stream.get_status()['tick_count'] == 1
+
+
+def test_ignores_other_symbols_and_bad_frames(standin, stream_factory):
+    server = standin([{'frames': ['not json', ticker_frame(1.0, symbol='ETHUSD'),
+                                  json.dumps({'type': 'mark_price', 'symbol': 'MARK:BTCUSD', 'price': '65500'})],
+                       'then': 'hold'}])
+    prices = []
+    stream_factory(server.url, prices)
+
+    assert wait_for(lambda: prices == [65500.0])
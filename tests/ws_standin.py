@@ -0,0 +1,153 @@
+# ws_standin.py
+# Minimal local WebSocket server that replays recorded Delta frames (test stand-in for DELTA_WS_URL)
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+
+_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def ticker_frame(price, symbol='BTCUSD'):
+    """Recorded v2/ticker frame जैसा message"""
+    return json.dumps({'type': 'v2/ticker', 'symbol': symbol, 'mark_price': str(price)})
+
+
+class StandInWebSocketServer:
+    """
+    हर connection के लिए एक script replay करता है: client का subscribe आने के बाद frames भेजता है,
+    फिर 'close' (connection drop), या 'hold' (खुला रखो, कोई frame नहीं - gap)।
+    scripts list में n-th entry n-th connection के लिए; खत्म होने पर आखिरी script दोहराई जाती है।
+    Client से आए text messages connection-wise received में रहते हैं।
+    """
+
+    def __init__(self, scripts, frame_interval=0.01):
+        self.scripts = scripts
+        self.frame_interval = frame_interval
+        self.received = []    # per connection: [text messages]
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen(8)
+        self._stopped = threading.Event()
+        self._conns = []
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self._sock.getsockname()[1]}"
+
+    @property
+    def connections(self):
+        return len(self.received)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        for conn in self._conns + [self._sock]:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    # ---- protocol ----
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self._conns.append(conn)
+            index = len(self.received)
+            self.received.append([])
+            script = self.scripts[min(index, len(self.scripts) - 1)]
+            threading.Thread(target=self._serve, args=(conn, index, script), daemon=True).start()
+
+    def _handshake(self, conn):
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                raise ConnectionError('closed during handshake')
+            request += chunk
+        key = next(line.split(b':', 1)[1].strip() for line in request.split(b'\r\n')
+                   if line.lower().startswith(b'sec-websocket-key:'))
+        accept = base64.b64encode(hashlib.sha1(key + _GUID).digest())
+        conn.sendall(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n'
+                     b'Connection: Upgrade\r\nSec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b''
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError('closed')
+            data += chunk
+        return data
+
+    def _read_frame(self, conn):
+        first, second = self._recv_exact(conn, 2)
+        opcode, length = first & 0x0F, second & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4) if second & 0x80 else b'\x00' * 4
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv_exact(conn, length)))
+        return opcode, payload
+
+    @staticmethod
+    def _send_frame(conn, payload, opcode=0x1):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < 65536:
+            header += bytes([126]) + struct.pack('>H', len(payload))
+        else:
+            header += bytes([127]) + struct.pack('>Q', len(payload))
+        conn.sendall(header + payload)
+
+    def _serve(self, conn, index, script):
+        try:
+            self._handshake(conn)
+            subscribed = False
+            while not subscribed:
+                opcode, payload = self._read_frame(conn)
+                if opcode == 0x8:
+                    return
+                if opcode == 0x9:
+                    self._send_frame(conn, payload, opcode=0xA)
+                elif opcode == 0x1:
+                    self.received[index].append(payload.decode())
+                    subscribed = json.loads(payload).get('type') == 'subscribe'
+            for frame in script.get('frames', []):
+                self._send_frame(conn, frame)
+                time.sleep(self.frame_interval)
+            if script.get('then', 'close') == 'hold':
+                conn.settimeout(0.2)
+                while not self._stopped.is_set():
+                    try:
+                        opcode, payload = self._read_frame(conn)
+                    except socket.timeout:
+                        continue
+                    if opcode == 0x8:
+                        return
+                    if opcode == 0x9:
+                        self._send_frame(conn, payload, opcode=0xA)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            try:
+                conn.close()
+            except OSError:
+                pass
@@ -0,0 +1,121 @@
+# trade_history.py
+# Append-only SQLite trade history with cursor pagination
+import json
+import os
+
+from db import get_database
+
+DB_PATH = 'trading_config.db'
+LEGACY_JSON_FILE = 'trade_history.json'
+
+INSERT_SQL = '''
+    INSERT OR IGNORE INTO trade_history (trade_id, timestamp, symbol, order_type, side, data)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+class TradeHistoryStore:
+    """
+    Trades एक append-only table में: हर insert O(1) (पूरी file rewrite नहीं), कोई retention cap नहीं।
+    seq (INTEGER PRIMARY KEY) ही pagination cursor है - newest first, before=<cursor> से अगला page।
+    Full trade dict JSON में रहता है; timestamp/symbol/order_type indexed columns filters के लिए हैं।
+    """
+
+    def __init__(self, db=None, legacy_file=LEGACY_JSON_FILE):
+        self.db = db or get_database(DB_PATH)
+        self._init_table()
+        if legacy_file:
+            self._import_legacy(legacy_file)
+
+    def _init_table(self):
+        with self.db.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS trade_history (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    trade_id TEXT UNIQUE,
+                    timestamp TEXT NOT NULL,
+                    symbol TEXT,
+                    order_type TEXT,
+                    side TEXT,
+                    data TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_trade_history_timestamp ON trade_history (timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_trade_history_symbol ON trade_history (symbol, seq)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_trade_history_order_type ON trade_history (order_type, seq)')
+
+    def _import_legacy(self, path):
+        """पुरानी trade_history.json एक बार import करके .migrated नाम से रख देता है"""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r') as f:
+                trades = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not import legacy trade history: {e}")
+            return
+        # File newest-first है; append oldest-first ताकि seq order सही रहे
+        with self.db.transaction() as conn:
+            conn.executemany(INSERT_SQL, [self._row(trade) for trade in reversed(trades) if isinstance(trade, dict)])
+        os.replace(path, path + '.migrated')
+        print(f"📂 Imported {len(trades)} trades from {path} into SQLite")
+
+    @staticmethod
+    def _row(trade):
+        return (
+            trade.get('id'),
+            trade.get('timestamp') or '',
+            trade.get('symbol'),
+            trade.get('order_type'),
+            trade.get('side'),
+            json.dumps(trade, default=str)
+        )
+
+    def append(self, trade):
+        """Trade जोड़ता है (trade में 'id' और 'timestamp' होने चाहिए)"""
+        self.db.execute(INSERT_SQL, self._row(trade))
+
+    def append_many(self, trades):
+        """कई trades एक transaction में"""
+        with self.db.transaction() as conn:
+            self.write_batch(conn, trades)
+
+    @classmethod
+    def write_batch(cls, conn, trades):
+        """दिए गए connection/transaction पर trades insert करता है (write-behind queue writer)"""
+        conn.executemany(INSERT_SQL, [cls._row(trade) for trade in trades])
+
+    def page(self, limit=100, before=None, symbol=None, order_type=None, since=None):
+        """
+        Newest-first page return करता है: (trades, next_cursor)।
+        next_cursor None है तो आगे कोई trade नहीं।
+        """
+        clauses, params = [], []
+        if before is not None:
+            clauses.append('seq < ?')
+            params.append(int(before))
+        if symbol:
+            clauses.append('symbol = ?')
+            params.append(symbol)
+        if order_type:
+            clauses.append('order_type = ?')
+            params.append(order_type)
+        if since:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.db.query(
+            f'SELECT seq, data FROM trade_history {where} ORDER BY seq DESC LIMIT ?',
+            (*params, int(limit) + 1)
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        trades = [json.loads(data) for _, data in rows]
+        next_cursor = rows[-1][0] if has_more and rows else None
+        return trades, next_cursor
+
+    def count(self):
+        return self.db.query_one('SELECT COUNT(*) FROM trade_history')[0]
+
+    def clear(self):
+        return self.db.execute('DELETE FROM trade_history')
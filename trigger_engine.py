@@ -0,0 +1,62 @@
+# trigger_engine.py
+# Event-driven trigger order engine - evaluates every price tick against a sorted level index
+import time
+
+
+class TriggerOrderEngine:
+    """
+    TriggerOrderStore के price index पर हर tick evaluate करता है और सिर्फ crossed orders
+    ('firing' में claim करके) execute_order(order, price) को देता है।
+    on_tick को PriceDispatcher subscription के रूप में register करें - ticks subscriber
+    के अपने thread पर evaluate होते हैं, ताकि price feed कभी order placement पर block न हो।
+    executor (जैसे ThreadPoolExecutor) देने पर एक साथ crossed orders concurrently place होते हैं;
+    न देने पर inline (replay/tests के लिए deterministic)।
+    """
+
+    def __init__(self, store, execute_order, log=print, executor=None, clock=time.time):
+        self.store = store
+        self.execute_order = execute_order
+        self.log = log
+        self.executor = executor
+        self.clock = clock
+        self.ticks_processed = 0
+        self.orders_fired = 0
+
+    def nearest_levels(self):
+        return self.store.nearest()
+
+    def on_tick(self, tick):
+        """PriceDispatcher handler - पिछली evaluation के बाद की पूरी high/low range check होती है"""
+        if tick.price:
+            self.process_tick(tick.price, tick.high, tick.low)
+
+    def process_tick(self, price, high=None, low=None):
+        """
+        एक tick evaluate करता है: [low, high] में cross हुए orders execute, बाकी untouched।
+        high/low न दें तो सिर्फ price sample check होता है।
+        """
+        self.ticks_processed += 1
+        for order in self.store.claim_crossed(price if high is None else high,
+                                              price if low is None else low):
+            self.orders_fired += 1
+            order['fired_at'] = self.clock()
+            if self.executor is not None:
+                self.executor.submit(self._execute, order, price)
+            else:
+                self._execute(order, price)
+
+    def _execute(self, order, price):
+        try:
+            self.execute_order(order, price)
+        except Exception as e:
+            self.log(f"Trigger execution error for {order['id']}: {e}")
+
+    def get_stats(self):
+        above, below = self.store.nearest()
+        return {
+            'resting_orders': len(self.store.index),
+            'nearest_above': above,
+            'nearest_below': below,
+            'ticks_processed': self.ticks_processed,
+            'orders_fired': self.orders_fired
+        }
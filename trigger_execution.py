@@ -0,0 +1,128 @@
+# trigger_execution.py
+# Crossed trigger order placement - shared by the Flask app and the replay harness
+import time
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+
+def trigger_client_order_id(order):
+    """Trigger id से deterministic client_order_id (32 hex chars) - retry पर वही id जाता है"""
+    return uuid.UUID(order['id']).hex
+
+
+def _strike_from_symbol(symbol):
+    parts = symbol.split('-') if symbol else []
+    return parts[2] if len(parts) >= 3 else None
+
+
+class TriggerOrderExecutor:
+    """
+    TriggerOrderEngine का execute_order callback: crossed order को idempotent market order से
+    place करता है, store में terminal status set करता है और side effects hooks से करता है।
+    - update_status(order_id, status, exchange_order_id) - DB status
+    - save_trade(trade_data) - executed order का trade history record
+    - notify(message) - Telegram (blocking न हो, caller खुद thread/queue दे)
+    - timer(name) - latency metric context manager
+    App और replay दोनों यही class चलाते हैं, इसलिए replay असली execution path validate करता है।
+    """
+
+    def __init__(self, store, api, expiry=None, update_status=None, save_trade=None, notify=None,
+                 timer=None, clock=time.time, history=100):
+        self.store = store
+        self.api = api
+        self.expiry = expiry
+        self.update_status = update_status or (lambda order_id, status, exchange_order_id=None: None)
+        self.save_trade = save_trade or (lambda trade_data: None)
+        self.notify = notify or (lambda message: None)
+        self.timer = timer or (lambda name: nullcontext())
+        self.clock = clock
+        self.timings = deque(maxlen=history)
+
+    def __call__(self, order, current_price):
+        """Crossed trigger order को place करता है (trigger executor pool से call होता है)"""
+        if self.expiry is not None:
+            self.expiry.cancel(order['id'])
+        fired_at = order.get('fired_at') or self.clock()
+        try:
+            order['client_order_id'] = trigger_client_order_id(order)
+            submitted_at = self.clock()
+            with self.timer('delta place_market_order trigger'):
+                result = self.api.place_market_order_idempotent(
+                    product_id=order['product_id'],
+                    side=order['side'],
+                    size=order['size'],
+                    client_order_id=order['client_order_id']
+                )
+            acked_at = self.clock()
+
+            order['timing'] = {
+                'queue_ms': round((submitted_at - fired_at) * 1000, 2),
+                'ack_ms': round((acked_at - submitted_at) * 1000, 2),
+                'total_ms': round((acked_at - fired_at) * 1000, 2),
+                'attempts': result.get('attempts', 1)
+            }
+            self.timings.append({
+                'id': order['id'],
+                'symbol': order['symbol'],
+                'success': 'error' not in result,
+                **order['timing']
+            })
+
+            if 'error' in result:
+                order['error'] = result['error']
+                self._finish(order, 'failed')
+                if result.get('unknown_state'):
+                    # Exchange पर order पहुँचा या नहीं पता नहीं - दोबारा place करने से पहले manually check हो
+                    order['unknown_state'] = True
+                    self.notify(
+                        f"⚠️ Trigger Order State Unknown\n"
+                        f"Symbol: {order['symbol']}\n"
+                        f"Action: {order['side'].upper()}\n"
+                        f"Quantity: {order['size']}\n"
+                        f"Client Order ID: {order['client_order_id']}\n"
+                        f"Check the exchange before placing it again."
+                    )
+                return order
+
+            order['executed_at'] = datetime.utcfromtimestamp(acked_at).isoformat()
+            order['order_id'] = (result.get('result') or {}).get('id', 'N/A')
+        except Exception as e:
+            order['error'] = str(e)
+            self._finish(order, 'failed')
+            return order
+
+        # Order exchange पर filled है - इसके बाद की कोई error status को 'failed' नहीं बनाती
+        self._finish(order, 'executed')
+        try:
+            self.save_trade({
+                'symbol': order['symbol'],
+                'product_id': order['product_id'],
+                'side': order['side'],
+                'size': order['size'],
+                'price': order.get('mark_price', 0),
+                'strike_price': _strike_from_symbol(order['symbol']),
+                'total_cost': order.get('total_cost', 0),
+                'order_id': order['order_id'],
+                'order_type': 'trigger',
+                'status': 'executed',
+                'trigger_price': order['trigger_price'],
+                'trigger_condition': order['trigger_condition']
+            })
+            self.notify(
+                f"✅ Trigger Order Executed\n"
+                f"Symbol: {order['symbol']}\n"
+                f"Action: {order['side'].upper()}\n"
+                f"Quantity: {order['size']}\n"
+                f"Trigger: {order['trigger_condition']} {order['trigger_price']}\n"
+                f"Executed At: {current_price}\n"
+                f"Fill Latency: {order['timing']['total_ms']} ms"
+            )
+        except Exception as e:
+            print(f"Trigger order {order['id']} post-execution error: {e}")
+        return order
+
+    def _finish(self, order, status):
+        self.store.transition(order['id'], status, expected=('firing',))
+        self.update_status(order['id'], status, order.get('order_id') if status == 'executed' else None)
@@ -0,0 +1,82 @@
+# trigger_store.py
+# Thread-safe trigger order store keyed by id, with its price-level index kept in sync
+import threading
+
+from price_levels import PriceLevelIndex
+
+# इन statuses में order store में रहता है; बाकी (executed/failed/expired/cancelled) पर हट जाता है
+ACTIVE_STATUSES = ('pending', 'firing')
+
+
+class TriggerOrderStore:
+    """
+    Trigger orders का single source of truth।
+    - add / cancel / status transition सब O(1) (index update O(log n)) और एक ही lock के अंदर
+    - transition compare-and-set है: fire, expire और cancel में से सिर्फ एक ही order को claim कर सकता है
+    - snapshot() lock के अंदर copy देता है, इसलिए Flask threads बिना race के iterate कर सकते हैं
+    """
+
+    def __init__(self, orders=()):
+        self.index = PriceLevelIndex()
+        self._orders = {}
+        self._lock = threading.RLock()
+        for order in orders:
+            self.add(order)
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_id):
+        return order_id in self._orders
+
+    def add(self, order):
+        """Pending order जोड़ता है - invalid trigger_condition/trigger_price पर ValueError"""
+        with self._lock:
+            if order.get('status', 'pending') == 'pending':
+                self.index.add(order['id'], float(order['trigger_price']), order['trigger_condition'])
+            self._orders[order['id']] = order
+        return order
+
+    def get(self, order_id):
+        with self._lock:
+            return self._orders.get(order_id)
+
+    def transition(self, order_id, status, expected=('pending',)):
+        """
+        Order का status expected में होने पर ही status बदलता है और order return करता है, वरना None।
+        Final status पर order store और price index दोनों से हटता है।
+        """
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None or order.get('status') not in expected:
+                return None
+            order['status'] = status
+            if status != 'pending':
+                self.index.remove(order_id)
+            if status not in ACTIVE_STATUSES:
+                del self._orders[order_id]
+            return order
+
+    def claim_crossed(self, high, low=None):
+        """[low, high] में cross हुए pending orders को 'firing' में ले जाकर return करता है"""
+        with self._lock:
+            claimed = []
+            for order_id in self.index.pop_crossed(high, low):
+                order = self._orders.get(order_id)
+                if order is not None and order.get('status') == 'pending':
+                    order['status'] = 'firing'
+                    claimed.append(order)
+            return claimed
+
+    def nearest(self):
+        return self.index.nearest()
+
+    def snapshot(self):
+        """सभी active orders की copies"""
+        with self._lock:
+            return [dict(order) for order in self._orders.values()]
+
+    def pending(self):
+        """Pending orders (objects, copies नहीं) - startup पर timers arm करने के लिए"""
+        with self._lock:
+            return [order for order in self._orders.values() if order.get('status') == 'pending']